@@ -1,4 +1,5 @@
 import { useEffect, useState } from 'react';
+import { storeMiniAppSession } from '@/lib/telegramAuth';
 
 export interface TelegramUser {
   id: number;
@@ -129,6 +130,7 @@ export async function validateTelegramData(initData: string, apiUrl: string = 'h
     }
 
     const data = await response.json();
+    storeMiniAppSession(data);
     return { valid: true, user: data.user };
   } catch (error) {
     console.error('Error validating Telegram data:', error);
@@ -4,6 +4,25 @@
 
 const API_URL = import.meta.env.VITE_DJANGO_API_URL || 'http://localhost:8000/api';
 
+const SESSION_KEY = 'miniapp_session_token';
+
+/**
+ * Keep the mini app session token returned by the auth endpoints
+ */
+export function storeMiniAppSession(data: { session_token?: string }) {
+  if (data.session_token) {
+    localStorage.setItem(SESSION_KEY, data.session_token);
+  }
+}
+
+/**
+ * Authorization header identifying the Telegram user to the mini app endpoints
+ */
+function miniAppSessionHeaders(): Record<string, string> {
+  const token = localStorage.getItem(SESSION_KEY);
+  return token ? { 'Authorization': `MiniApp ${token}` } : {};
+}
+
 export interface TelegramAuthResult {
   success: boolean;
   access_token?: string;
@@ -42,6 +61,7 @@ export async function authenticateWithToken(token: string): Promise<TelegramAuth
     const data = await response.json();
     
     // Store tokens
+    storeMiniAppSession(data);
     if (data.access_token) {
       localStorage.setItem('access_token', data.access_token);
     }
@@ -88,6 +108,7 @@ export async function authenticateWithTelegram(initData: string): Promise<Telegr
     const data = await response.json();
     
     // Store tokens
+    storeMiniAppSession(data);
     if (data.access_token) {
       localStorage.setItem('access_token', data.access_token);
     }
@@ -115,13 +136,11 @@ export async function authenticateWithTelegram(initData: string): Promise<Telegr
  */
 export async function getOrCreateTelegramWorkerProfile(telegramId: string, phoneNumber?: string) {
   try {
-    const token = localStorage.getItem('access_token');
-    
     const response = await fetch(`${API_URL}/telegram/worker-profile/`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        ...(token && { 'Authorization': `Bearer ${token}` }),
+        ...miniAppSessionHeaders(),
       },
       body: JSON.stringify({
         telegram_id: telegramId,
@@ -151,7 +170,10 @@ export async function checkSignupStatus(telegramId: string): Promise<{
   profileId?: string;
 }> {
   try {
-    const response = await fetch(`${API_URL}/telegram/signup-status/?telegram_id=${telegramId}`);
+    // telegram_id is only honoured by a DEBUG backend; otherwise the session says who we are
+    const response = await fetch(`${API_URL}/telegram/signup-status/?telegram_id=${telegramId}`, {
+      headers: miniAppSessionHeaders(),
+    });
     
     if (!response.ok) {
       return {
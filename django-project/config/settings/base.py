@@ -147,6 +147,72 @@ TELEGRAM_BOT_TOKEN = getenv("TELEGRAM_BOT_TOKEN", None)
 if not TELEGRAM_BOT_TOKEN:
     raise ValueError("TELEGRAM_BOT_TOKEN environment variable not set")
 
+TELEGRAM_API_BASE_URL = getenv("TELEGRAM_API_BASE_URL", "https://api.telegram.org/bot")
+
+# Shared HTTP client used for outgoing notifications
+TELEGRAM_NOTIFY_POOL_SIZE = int(getenv("TELEGRAM_NOTIFY_POOL_SIZE", 8))
+TELEGRAM_NOTIFY_CONNECT_TIMEOUT = float(getenv("TELEGRAM_NOTIFY_CONNECT_TIMEOUT", 5))
+TELEGRAM_NOTIFY_READ_TIMEOUT = float(getenv("TELEGRAM_NOTIFY_READ_TIMEOUT", 10))
+
+# Conversation state store: "memory" for one bot process, "cache" for several
+TELEGRAM_STATE_STORE = getenv("TELEGRAM_STATE_STORE", "memory")
+TELEGRAM_STATE_FLUSH_INTERVAL = float(getenv("TELEGRAM_STATE_FLUSH_INTERVAL", 2))
+TELEGRAM_STATE_IDLE_TIMEOUT = int(getenv("TELEGRAM_STATE_IDLE_TIMEOUT", 86400))
+
+# Threads (and database connections) the bot uses for queries; see telegram_bot/db.py
+TELEGRAM_DB_POOL_SIZE = int(getenv("TELEGRAM_DB_POOL_SIZE", 8))
+
+# Inline keyboard lists; see telegram_bot/paging.py
+TELEGRAM_PAGE_SIZE = int(getenv("TELEGRAM_PAGE_SIZE", 8))
+TELEGRAM_PAGE_CACHE_TTL = float(getenv("TELEGRAM_PAGE_CACHE_TTL", 10))
+
+# Concurrent update processing; see telegram_bot/scheduler.py
+TELEGRAM_MAX_CONCURRENT_UPDATES = int(getenv("TELEGRAM_MAX_CONCURRENT_UPDATES", 32))
+TELEGRAM_MAX_PENDING_UPDATES = int(getenv("TELEGRAM_MAX_PENDING_UPDATES", 1000))
+TELEGRAM_UPDATE_MAX_WAIT = float(getenv("TELEGRAM_UPDATE_MAX_WAIT", 60))
+
+# Update delivery: "polling" runs the runbot command, "webhook" serves updates
+# from the ASGI app at /telegram/webhook/ behind a secret token
+TELEGRAM_BOT_MODE = getenv("TELEGRAM_BOT_MODE", "polling")
+TELEGRAM_WEBHOOK_SECRET = getenv("TELEGRAM_WEBHOOK_SECRET", None)
+
+# Bot metrics: scraped from /telegram/metrics/ with this bearer token, and
+# logged by the bot every interval seconds; see telegram_bot/metrics.py
+TELEGRAM_METRICS_TOKEN = getenv("TELEGRAM_METRICS_TOKEN", None)
+TELEGRAM_METRICS_LOG_INTERVAL = float(getenv("TELEGRAM_METRICS_LOG_INTERVAL", 300))
+
+# Mini app: oldest initData accepted, and how long the session tokens issued
+# for it last; see cpass_integration/webapp_sessions.py
+TELEGRAM_WEBAPP_AUTH_MAX_AGE = int(getenv("TELEGRAM_WEBAPP_AUTH_MAX_AGE", 86400))
+TELEGRAM_WEBAPP_SESSION_TTL = int(getenv("TELEGRAM_WEBAPP_SESSION_TTL", 900))
+
+# Shared cache, the L2 behind core.cache's per-process L1: "database" (run
+# createcachetable), "file", "redis" (CACHE_URL, needs the redis package) or
+# "locmem", which is per process and only fit for tests and local runs
+CACHE_BACKEND = getenv("CACHE_BACKEND", "database")
+if CACHE_BACKEND == "redis":
+    _cache = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": getenv("CACHE_URL", "redis://localhost:6379/0"),
+    }
+elif CACHE_BACKEND == "file":
+    _cache = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": getenv("CACHE_LOCATION", str(BASE_DIR / ".cache")),
+        "OPTIONS": {"MAX_ENTRIES": int(getenv("CACHE_MAX_ENTRIES", 10000))},
+    }
+elif CACHE_BACKEND == "locmem":
+    _cache = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+else:
+    _cache = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": int(getenv("CACHE_MAX_ENTRIES", 10000))},
+    }
+CACHES = {"default": {**_cache, "KEY_PREFIX": getenv("CACHE_KEY_PREFIX", "cpass")}}
+CACHE_L1_TIMEOUT = float(getenv("CACHE_L1_TIMEOUT", 5))
+CACHE_L1_MAX_ENTRIES = int(getenv("CACHE_L1_MAX_ENTRIES", 1000))
+
 CPASS_URL = getenv("CPASS_URL", None)
 if not CPASS_URL:
     raise ValueError("CPASS_URL environment variable not set")
@@ -13,6 +13,7 @@ urlpatterns = [
     path("api/users/", include("workers.urls")),
     path("api/tasks/", include("work_management.urls")),
     path("api/", include("cpass_integration.urls")),
+    path("telegram/", include("telegram_bot.urls")),
     path(
         "",
         TemplateView.as_view(
@@ -0,0 +1,172 @@
+"""
+Two-tier cache usable by any app.
+
+Django's default cache is the shared tier (L2). It is set up by
+``CACHE_BACKEND`` in settings: a database table by default, so the web
+workers, ``runbot`` and the background commands all see the same entries.
+``Namespace`` puts a small per-process LRU (L1) in front of it for data
+that may be a few seconds stale:
+
+    summaries = Namespace("task-summary", local_timeout=5)
+    summary = summaries.get_or_set(user_id, lambda: compute(user_id), 30)
+    summaries.delete(user_id)  # this process's L1 and the shared L2
+    summaries.clear()  # every key of the namespace, in every process
+
+Keys are stored as ``<namespace>:<version>:<key>``. ``clear`` gives the
+namespace a new version in L2, which orphans the old entries until they
+expire. Other processes pick up the new version within ``local_timeout``
+seconds (default ``CACHE_L1_TIMEOUT``, 5). Deletes reach other processes'
+L1 only when their copy expires. Data that must disappear everywhere at
+once, like one-time tokens, should use ``local_timeout=0``, which skips L1,
+or the cache directly.
+
+Lookups are counted per namespace as L1 hits, L2 hits and misses; ``stats``
+returns the counts.
+"""
+
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+MISSING = object()
+OUTCOMES = ("l1_hit", "l2_hit", "miss")
+
+_counters = Counter()
+_counters_lock = threading.Lock()
+
+
+def _count(namespace, outcome):
+    with _counters_lock:
+        _counters[namespace, outcome] += 1
+
+
+def stats():
+    """{namespace: {"l1_hit": n, "l2_hit": n, "miss": n}}"""
+    result = {}
+    with _counters_lock:
+        for (namespace, outcome), count in _counters.items():
+            result.setdefault(namespace, dict.fromkeys(OUTCOMES, 0))[outcome] = count
+    return result
+
+
+class LocalLRU:
+    """Thread-safe, size-bounded LRU whose entries expire"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        # key -> (monotonic expiry, value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + timeout, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Namespace:
+    def __init__(self, name, local_timeout=None, max_local_entries=None, alias=None):
+        self.name = name
+        if local_timeout is None:
+            local_timeout = getattr(settings, "CACHE_L1_TIMEOUT", 5)
+        self.local_timeout = local_timeout
+        self.local = LocalLRU(
+            max_local_entries or getattr(settings, "CACHE_L1_MAX_ENTRIES", 1000)
+        )
+        self.alias = alias or DEFAULT_CACHE_ALIAS
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    @property
+    def version_key(self):
+        return f"{self.name}:version"
+
+    def version(self):
+        version = self.local.get(self.version_key)
+        if version is MISSING:
+            version = self.shared.get(self.version_key)
+            if version is None:
+                # Versions start from the clock rather than 1, so a version
+                # evicted from L2 can't bring back entries orphaned by clear()
+                self.shared.add(self.version_key, time.time_ns(), None)
+                version = self.shared.get(self.version_key)
+            self._remember(self.version_key, version)
+        return version
+
+    def make_key(self, key):
+        return f"{self.name}:{self.version()}:{key}"
+
+    def _remember(self, full_key, value, timeout=DEFAULT_TIMEOUT):
+        local_timeout = self.local_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            local_timeout = min(local_timeout, timeout)
+        if local_timeout > 0:
+            self.local.set(full_key, value, local_timeout)
+
+    def get(self, key, default=None):
+        full_key = self.make_key(key)
+        value = self.local.get(full_key)
+        if value is not MISSING:
+            _count(self.name, "l1_hit")
+            return value
+        value = self.shared.get(full_key, MISSING)
+        if value is MISSING:
+            _count(self.name, "miss")
+            return default
+        _count(self.name, "l2_hit")
+        self._remember(full_key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        full_key = self.make_key(key)
+        self.shared.set(full_key, value, timeout)
+        self._remember(full_key, value, timeout)
+
+    def get_or_set(self, key, default, timeout=DEFAULT_TIMEOUT):
+        """Cached value for ``key``, else ``default`` (called if callable) stored"""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = default() if callable(default) else default
+            self.set(key, value, timeout)
+        return value
+
+    def delete(self, key):
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        full_keys = [self.make_key(key) for key in keys]
+        for full_key in full_keys:
+            self.local.delete(full_key)
+        self.shared.delete_many(full_keys)
+
+    def clear(self):
+        """Drop every key of the namespace, in every process"""
+        self.shared.set(self.version_key, time.time_ns(), None)
+        self.local.clear()
@@ -2,20 +2,35 @@
 Telegram Mini App integration views
 """
 
+import functools
 import hashlib
 import hmac
 import json
+import time
 from urllib.parse import parse_qsl
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import OuterRef, Subquery
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from telegram_bot.models import ContactVerification
+from work_management import summary
 from workers.users_models import WorkerProfile
 from .auth_tokens import validate_auth_token, generate_auth_token
+from .webapp_sessions import (
+    MiniAppSession,
+    MiniAppSessionAuthentication,
+    get_session,
+    get_telegram_id,
+    session_response,
+)
 
 User = get_user_model()
 
@@ -47,10 +62,21 @@ def generate_token(request):
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@functools.lru_cache(maxsize=4)
+def webapp_secret_key(bot_token: str) -> bytes:
+    """Key initData is signed with; it only depends on the bot token"""
+    return hmac.new(
+        key=b"WebAppData", msg=bot_token.encode(), digestmod=hashlib.sha256
+    ).digest()
+
+
 def validate_telegram_webapp_data(init_data: str, bot_token: str) -> dict:
     """
     Validate Telegram WebApp initData
     Returns parsed data if valid, raises ValueError if invalid
+
+    initData older than TELEGRAM_WEBAPP_AUTH_MAX_AGE seconds is rejected
+    before its signature is checked.
     """
     try:
         parsed_data = dict(parse_qsl(init_data))
@@ -59,18 +85,24 @@ def validate_telegram_webapp_data(init_data: str, bot_token: str) -> dict:
         if not received_hash:
             raise ValueError("No hash provided")
 
+        try:
+            auth_date = int(parsed_data["auth_date"])
+        except (KeyError, ValueError):
+            raise ValueError("No auth_date provided")
+        max_age = getattr(settings, "TELEGRAM_WEBAPP_AUTH_MAX_AGE", 86400)
+        if max_age and time.time() - auth_date > max_age:
+            raise ValueError("Init data expired")
+
         data_check_arr = [f"{k}={v}" for k, v in sorted(parsed_data.items())]
         data_check_string = "\n".join(data_check_arr)
 
-        secret_key = hmac.new(
-            key=b"WebAppData", msg=bot_token.encode(), digestmod=hashlib.sha256
-        ).digest()
-
         calculated_hash = hmac.new(
-            key=secret_key, msg=data_check_string.encode(), digestmod=hashlib.sha256
+            key=webapp_secret_key(bot_token),
+            msg=data_check_string.encode(),
+            digestmod=hashlib.sha256,
         ).hexdigest()
 
-        if calculated_hash != received_hash:
+        if not hmac.compare_digest(calculated_hash, received_hash):
             raise ValueError("Invalid hash")
 
         if "user" in parsed_data:
@@ -82,9 +114,20 @@ def validate_telegram_webapp_data(init_data: str, bot_token: str) -> dict:
 
 
 @api_view(["POST"])
+@authentication_classes([MiniAppSessionAuthentication])
 @permission_classes([AllowAny])
 def validate_webapp_data(request):
 
+    session = get_session(request)
+    if session:
+        return Response(
+            {
+                "valid": True,
+                "user": session.telegram_user,
+                "auth_date": str(session.auth_date),
+            }
+        )
+
     init_data = request.data.get("init_data")
     if not init_data:
         return Response(
@@ -100,13 +143,20 @@ def validate_webapp_data(request):
 
     try:
         validated_data = validate_telegram_webapp_data(init_data, bot_token)
-        return Response(
-            {
-                "valid": True,
-                "user": validated_data.get("user"),
-                "auth_date": validated_data.get("auth_date"),
-            }
-        )
+        user_data = validated_data.get("user")
+        response = {
+            "valid": True,
+            "user": user_data,
+            "auth_date": validated_data.get("auth_date"),
+        }
+        if user_data and "id" in user_data:
+            session = MiniAppSession(
+                telegram_id=str(user_data["id"]),
+                telegram_user=user_data,
+                auth_date=int(validated_data["auth_date"]),
+            )
+            response.update(session_response(session))
+        return Response(response)
     except ValueError as e:
         return Response(
             {"valid": False, "error": str(e)}, status=status.HTTP_400_BAD_REQUEST
@@ -131,7 +181,9 @@ def telegram_auth(request):
 
         try:
             user = User.objects.get(telegram_id=telegram_id)
+            full_name = user.full_name
         except User.DoesNotExist:
+            user = None
             try:
                 contact = ContactVerification.objects.get(telegram_id=telegram_id)
                 telegram_username = contact.telegram_username
@@ -153,6 +205,14 @@ def telegram_auth(request):
             # )
 
         # refresh = RefreshToken.for_user(user)
+        # The bot signed the token for this Telegram user, so it can start a
+        # mini app session like validated initData does
+        session = MiniAppSession(
+            telegram_id=str(telegram_id),
+            user_id=str(user.id) if user else None,
+            role=user.user_type if user else None,
+            phone_number=phone_number,
+        )
 
         return Response(
             {
@@ -165,6 +225,7 @@ def telegram_auth(request):
                     "phone_number": phone_number or "",
                     "role": "worker",
                 },
+                **session_response(session),
             }
         )
 
@@ -221,6 +282,14 @@ def telegram_auth(request):
             )
 
         refresh = RefreshToken.for_user(user)
+        session = MiniAppSession(
+            telegram_id=str(user.telegram_id),
+            user_id=str(user.id),
+            role=user.user_type,
+            phone_number=user.phone_number,
+            telegram_user=user_data,
+            auth_date=int(validated_data["auth_date"]),
+        )
 
         return Response(
             {
@@ -233,6 +302,7 @@ def telegram_auth(request):
                     "phone_number": user.phone_number or "",
                     "role": user.user_type,
                 },
+                **session_response(session),
             }
         )
 
@@ -249,15 +319,26 @@ def telegram_auth(request):
 
 
 @api_view(["GET"])
+@authentication_classes([MiniAppSessionAuthentication])
 @permission_classes([AllowAny])
 def signup_status(request):
     """ """
-    telegram_id = request.query_params.get("telegram_id")
-    if not telegram_id:
+    session = get_session(request)
+    if session and session.user_id:
+        # The session already says who the user is
+        worker_profile = WorkerProfile.objects.filter(user_id=session.user_id).first()
         return Response(
-            {"error": "telegram_id is required"}, status=status.HTTP_400_BAD_REQUEST
+            {
+                "completed": bool(worker_profile),
+                "hasProfile": bool(worker_profile),
+                "contactVerified": True,
+                "workerId": session.user_id,
+                "profileId": worker_profile.id if worker_profile else None,
+            }
         )
 
+    telegram_id = get_telegram_id(request, request.query_params.get("telegram_id"))
+
     try:
         user = User.objects.filter(telegram_id=telegram_id).first()
         if not user:
@@ -289,17 +370,13 @@ def signup_status(request):
 
 
 @api_view(["POST"])
+@authentication_classes([MiniAppSessionAuthentication])
 @permission_classes([AllowAny])
 def get_or_create_worker_profile(request):
     """ """
-    telegram_id = request.data.get("telegram_id")
+    telegram_id = get_telegram_id(request, request.data.get("telegram_id"))
     phone_number = request.data.get("phone_number")
 
-    if not telegram_id:
-        return Response(
-            {"error": "telegram_id is required"}, status=status.HTTP_400_BAD_REQUEST
-        )
-
     try:
         user = User.objects.filter(telegram_id=telegram_id).first()
         if not user:
@@ -329,3 +406,105 @@ def get_or_create_worker_profile(request):
 
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def worker_profile_summary(user, profile):
+    return {
+        "id": str(profile.id),
+        "full_name": user.full_name or profile.full_name,
+        "phone_number": profile.phone_number or user.phone_number,
+        "location": profile.location,
+        "tier": profile.tier,
+        "experience_duration": profile.experience_duration or "",
+        "reputation_score": float(getattr(profile, "reputation_score", 0)),
+        "total_tasks_completed": getattr(profile, "total_tasks_completed", 0),
+    }
+
+
+@api_view(["GET"])
+@authentication_classes([MiniAppSessionAuthentication])
+@permission_classes([AllowAny])
+def bootstrap(request):
+    """
+    Everything the mini app needs when it opens, in one call.
+
+    Replaces the user, signup-status, profile and worker-profile calls. The
+    user, worker profile and contact come from one query; task counts come
+    from the cached task summary.
+    """
+    telegram_id = get_telegram_id(request, request.query_params.get("telegram_id"))
+    try:
+        telegram_id = int(telegram_id)
+    except ValueError:
+        return Response(
+            {"error": "telegram_id must be an integer"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    contacts = ContactVerification.objects.filter(telegram_id=OuterRef("telegram_id"))
+    user = (
+        User.objects.select_related("worker_profile")
+        .annotate(contact_phone=Subquery(contacts.values("phone_number")[:1]))
+        .filter(telegram_id=telegram_id)
+        .first()
+    )
+
+    if not user:
+        contact = (
+            ContactVerification.objects.filter(telegram_id=telegram_id)
+            .values("phone_number")
+            .first()
+        )
+        return Response(
+            {
+                "telegram_id": str(telegram_id),
+                "user": None,
+                "contact": {
+                    "verified": contact is not None,
+                    "phone_number": contact["phone_number"] if contact else None,
+                },
+                "signup": {
+                    "completed": False,
+                    "hasProfile": False,
+                    "contactVerified": contact is not None,
+                    "workerId": None,
+                    "profileId": None,
+                },
+                "profile": None,
+                "tasks": None,
+            }
+        )
+
+    profile = getattr(user, "worker_profile", None)
+    tasks = summary.get_summary(user.id, user.user_type)
+
+    return Response(
+        {
+            "telegram_id": str(telegram_id),
+            "user": {
+                "id": str(user.id),
+                "full_name": user.full_name or "",
+                "role": user.user_type,
+                "telegram_username": user.telegram_username,
+                "phone_number": user.phone_number or None,
+            },
+            "contact": {
+                # Users created outside the bot may not have shared one
+                "verified": user.contact_phone is not None,
+                "phone_number": user.contact_phone or user.phone_number,
+            },
+            "signup": {
+                "completed": bool(profile),
+                "hasProfile": bool(profile),
+                "contactVerified": user.contact_phone is not None,
+                "workerId": str(user.id),
+                "profileId": str(profile.id) if profile else None,
+            },
+            "profile": worker_profile_summary(user, profile) if profile else None,
+            "tasks": {
+                "total": tasks["total"],
+                "by_status": tasks["by_status"],
+                "ratings": tasks["ratings"],
+            },
+        }
+    )
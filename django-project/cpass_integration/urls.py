@@ -44,4 +44,5 @@ urlpatterns = [
         telegram_views.get_or_create_worker_profile,
         name="telegram_worker_profile",
     ),
+    path("telegram/bootstrap/", telegram_views.bootstrap, name="telegram_bootstrap"),
 ]
@@ -1,13 +1,18 @@
 """CPASS integration API views"""
 
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+)
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from django.utils import timezone
 from workers.users_models import CustomUser as User, WorkerProfile
 from work_management.models import Role
 from telegram_bot.models import ConversationState, ContactVerification
+from .webapp_sessions import MiniAppSessionAuthentication, get_telegram_id
 import logging
 
 logger = logging.getLogger(__name__)
@@ -77,9 +82,16 @@ def cpass_onboarding(request):
 
 
 @api_view(["GET"])
+@authentication_classes([MiniAppSessionAuthentication])
 @permission_classes([AllowAny])
 def get_user_by_telegram_id(request, telegram_id):
     """Get user info by telegram ID for the Web App"""
+    if get_telegram_id(request, telegram_id) != str(telegram_id):
+        return Response(
+            {"error": "Session belongs to another Telegram user"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
     try:
         user = User.objects.select_related("worker_profile").get(
             telegram_id=telegram_id
@@ -0,0 +1,107 @@
+"""
+Signed session tokens for the Telegram Mini App.
+
+Validating ``initData`` costs an HMAC check and usually a user lookup, so
+``telegram_auth`` and ``validate_webapp_data`` do it once and hand back a
+session token signed with ``SECRET_KEY``. The mini app sends it on later
+calls as ``Authorization: MiniApp <token>``; ``MiniAppSessionAuthentication``
+only checks the signature and age, so those calls need no database access
+to know who is calling. Tokens expire after ``TELEGRAM_WEBAPP_SESSION_TTL``
+seconds (default 900), after which the mini app validates ``initData`` again.
+
+Endpoints that act for a Telegram user take its id from the session with
+``get_telegram_id``. A ``telegram_id`` sent by the client is only honoured
+with ``DEBUG`` on, for trying the mini app outside Telegram.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from django.conf import settings
+from django.core import signing
+from rest_framework import authentication, exceptions
+
+SESSION_SALT = "cpass_integration.webapp_session"
+AUTH_HEADER_TYPE = "MiniApp"
+
+
+def get_session_ttl() -> int:
+    return getattr(settings, "TELEGRAM_WEBAPP_SESSION_TTL", 900)
+
+
+@dataclass(frozen=True)
+class MiniAppSession:
+    telegram_id: str
+    # Set once the Telegram user has a CPASS account
+    user_id: Optional[str] = None
+    role: Optional[str] = None
+    phone_number: Optional[str] = None
+    # The ``user`` object and ``auth_date`` from initData
+    telegram_user: Optional[dict] = None
+    auth_date: Optional[int] = None
+
+
+def issue_session(session: MiniAppSession) -> str:
+    return signing.dumps(asdict(session), salt=SESSION_SALT, compress=True)
+
+
+def read_session(token: str) -> Optional[MiniAppSession]:
+    """The session in ``token``, or None if it is forged or expired"""
+    try:
+        data = signing.loads(token, salt=SESSION_SALT, max_age=get_session_ttl())
+        return MiniAppSession(**data)
+    except (signing.BadSignature, TypeError):
+        return None
+
+
+def get_session(request) -> Optional[MiniAppSession]:
+    auth = getattr(request, "auth", None)
+    return auth if isinstance(auth, MiniAppSession) else None
+
+
+def get_telegram_id(request, fallback=None) -> str:
+    """
+    Telegram id of the mini app user making ``request``, from its session.
+
+    ``fallback`` is a client-supplied id, used only when ``DEBUG`` is on.
+    Raises ``NotAuthenticated`` (401) when there is no usable id.
+    """
+    session = get_session(request)
+    if session is not None:
+        return session.telegram_id
+    if settings.DEBUG and fallback:
+        return str(fallback)
+    raise exceptions.NotAuthenticated("A mini app session is required")
+
+
+def session_response(session: MiniAppSession) -> dict:
+    """Fields added to auth responses so the mini app can use the session"""
+    return {
+        "session_token": issue_session(session),
+        "session_expires_in": get_session_ttl(),
+    }
+
+
+class MiniAppSessionAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticates ``Authorization: MiniApp <token>`` headers.
+
+    Like ``APIKeyAuthentication`` it sets ``request.auth`` (to the
+    ``MiniAppSession``) and leaves ``request.user`` anonymous.
+    """
+
+    def authenticate(self, request):
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        parts = header.split()
+        if not parts or parts[0] != AUTH_HEADER_TYPE:
+            return None
+        if len(parts) != 2:
+            raise exceptions.AuthenticationFailed("Invalid session header")
+
+        session = read_session(parts[1])
+        if session is None:
+            raise exceptions.AuthenticationFailed("Invalid or expired session")
+        return (None, session)
+
+    def authenticate_header(self, request):
+        return AUTH_HEADER_TYPE
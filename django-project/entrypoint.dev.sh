@@ -10,6 +10,7 @@ SETTINGS=--settings=config.settings.dev
 python $MANAGE collectstatic --noinput $SETTINGS
 python $MANAGE makemigrations $SETTINGS
 python $MANAGE migrate $SETTINGS
+python $MANAGE createcachetable $SETTINGS
 
 # Seed initial data
 python $MANAGE seed_categories_jobs $SETTINGS
@@ -21,8 +22,20 @@ python $MANAGE seed_demo_institutions \
 --with-workers \
 --output-json "$SHARED_JSON" $SETTINGS
 
-python $MANAGE runbot $SETTINGS &
-python $MANAGE runserver $LISTENINGADDR $SETTINGS &
+if [ "$TELEGRAM_BOT_MODE" = "webhook" ]; then
+    # Updates are posted to /telegram/webhook/ and handled inside the ASGI app
+    python $MANAGE setwebhook "$TELEGRAM_WEBHOOK_URL" $SETTINGS
+else
+    python $MANAGE runbot $SETTINGS &
+fi
+python $MANAGE sweep_deadlines $SETTINGS &
+python $MANAGE dispatch_notifications $SETTINGS &
+if [ "$TELEGRAM_BOT_MODE" = "webhook" ]; then
+    DJANGO_SETTINGS_MODULE=config.settings.dev uvicorn config.asgi:application \
+    --host 0.0.0.0 --port 8000 --proxy-headers &
+else
+    python $MANAGE runserver $LISTENINGADDR $SETTINGS &
+fi
 
 wait -n
 exit $?
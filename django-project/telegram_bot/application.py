@@ -0,0 +1,116 @@
+"""
+Builds the python-telegram-bot ``Application`` with all bot handlers.
+
+Shared by the ``runbot`` command, which fetches updates by long polling, and
+by the webhook view, which feeds updates posted by Telegram into the same
+application running inside the ASGI server.
+"""
+
+import logging
+
+from django.conf import settings
+from telegram import BotCommand
+from telegram.ext import (
+    Application,
+    CallbackQueryHandler,
+    CommandHandler,
+    MessageHandler,
+    filters,
+)
+
+from telegram_bot import bot as bot_module
+from telegram_bot import metrics
+from telegram_bot.instrumentation import InstrumentedRequest, instrument
+from telegram_bot.scheduler import ChatOrderedUpdateProcessor
+from telegram_bot.state_store import get_state_store
+
+logger = logging.getLogger(__name__)
+
+BOT_COMMANDS = [
+    BotCommand(command="/start", description="Start the bot"),
+    BotCommand(command="/help", description="Show this help message"),
+]
+
+
+async def start_background_tasks(application):
+    """Register the command list and log bot metrics while the bot runs"""
+    try:
+        await application.bot.set_my_commands(BOT_COMMANDS)
+    except Exception as e:
+        logger.warning(f"Failed to set bot commands: {e}")
+    application.bot_data["metrics_task"] = application.create_task(
+        metrics.log_periodically(
+            getattr(settings, "TELEGRAM_METRICS_LOG_INTERVAL", 300)
+        )
+    )
+
+
+async def stop_background_tasks(application):
+    """Persist buffered conversation states before the bot exits"""
+    task = application.bot_data.pop("metrics_task", None)
+    if task:
+        task.cancel()
+    await get_state_store().writer.stop()
+    metrics.log_summary()
+
+
+def build_application(token=None, base_url=None, updater=True, processor=None):
+    """
+    Create the bot application and register its handlers.
+
+    Pass ``updater=False`` when updates arrive through the webhook rather
+    than from ``run_polling``. Updates are processed concurrently across
+    chats by a ``ChatOrderedUpdateProcessor`` unless another processor is
+    given. Handlers and Bot API calls are timed for ``metrics``.
+    """
+    builder = (
+        Application.builder()
+        .token(token or settings.TELEGRAM_BOT_TOKEN)
+        .base_url(base_url or settings.TELEGRAM_API_BASE_URL)
+        .request(InstrumentedRequest())
+        .concurrent_updates(processor or ChatOrderedUpdateProcessor())
+        .post_init(start_background_tasks)
+        .post_shutdown(stop_background_tasks)
+    )
+    if not updater:
+        builder = builder.updater(None)
+    application = builder.build()
+
+    application.add_handler(
+        CommandHandler("start", instrument("start", bot_module.start))
+    )
+    application.add_handler(
+        CommandHandler("help", instrument("help", bot_module.help_command))
+    )
+    application.add_handler(
+        CommandHandler("profile", instrument("profile", bot_module.profile))
+    )
+    application.add_handler(
+        CommandHandler("cancel", instrument("cancel", bot_module.cancel))
+    )
+
+    # Contact handler
+    application.add_handler(
+        MessageHandler(
+            filters.CONTACT, instrument("contact", bot_module.handle_contact)
+        )
+    )
+
+    application.add_handler(
+        CallbackQueryHandler(
+            instrument(
+                "button_callback",
+                bot_module.button_callback,
+                route=bot_module.callback_route,
+            )
+        )
+    )
+
+    application.add_handler(
+        MessageHandler(
+            filters.TEXT & ~filters.COMMAND,
+            instrument("message", bot_module.handle_message),
+        )
+    )
+
+    return application
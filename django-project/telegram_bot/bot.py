@@ -7,13 +7,15 @@ from telegram.ext import ContextTypes
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup, ReplyKeyboardRemove
 
 from django.conf import settings
-from asgiref.sync import sync_to_async
+from telegram_bot.db import database_sync_to_async
 from cpass_integration.auth_tokens import generate_auth_token
 
 from workers.users_models import CustomUser as User
 from work_management.models import Task, Role
 from telegram_bot.models import ContactVerification
+from telegram_bot.contacts import verified_contacts
 from telegram_bot.notifications import send_telegram_notification, notify_task_completed
+from telegram_bot.paging import parse_page_callback
 from telegram_bot.keyboards import *
 from telegram_bot.utils import *
 
@@ -32,11 +34,7 @@ def require_contact(func):
         telegram_id = update.effective_user.id
 
         # Check if contact was verified
-        @sync_to_async
-        def has_shared_contact():
-            return ContactVerification.objects.filter(telegram_id=telegram_id).exists()
-
-        if not await has_shared_contact():
+        if not await verified_contacts.is_verified(telegram_id):
             await update.message.reply_text(
                 "⚠️ Please share your contact first to use this bot.\n\n"
                 "Use /start to begin.",
@@ -147,7 +145,7 @@ async def handle_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     user = await get_user_by_telegram_id(telegram_id)
 
-    @sync_to_async
+    @database_sync_to_async
     def save_contact_verification():
         try:
             ContactVerification.objects.update_or_create(
@@ -158,6 +156,8 @@ async def handle_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
                     "first_name": update.effective_user.first_name or "",
                 },
             )
+            # Drop any cached "not verified" answer as soon as the row exists
+            verified_contacts.add(telegram_id)
 
             if user:
                 user_obj = User.objects.get(telegram_id=telegram_id)
@@ -176,6 +176,8 @@ async def handle_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
         return
 
+    invalidate_users(telegram_ids=[telegram_id])
+
     if user:
         await update.message.reply_text(
             "✅ Contact verified!\n\n" f"Welcome back, {user['full_name']}!",
@@ -222,6 +224,36 @@ async def handle_contact(update: Update, context: ContextTypes.DEFAULT_TYPE):
         # )
 
 
+# callback_data prefixes routed by button_callback, checked in the same order
+CALLBACK_ROUTES = [
+    "role_",
+    "pg:",
+    "menu_",
+    "category_",
+    "task_",
+    "worker_",
+    "assign_to_",
+    "assign_task_",
+    "start_task_",
+    "decline_task_",
+    "complete_task_",
+    "update_progress_",
+    "rate_task_",
+    "rate_",
+    "add_comment_",
+]
+CALLBACK_ACTIONS = ["back_to_menu", "back_to_tasks", "skip", "cancel"]
+
+
+def callback_route(update: Update):
+    """The button_callback route an update takes, as a metrics label"""
+    data = update.callback_query.data or ""
+    for prefix in CALLBACK_ROUTES:
+        if data.startswith(prefix):
+            return prefix
+    return data if data in CALLBACK_ACTIONS else "unknown"
+
+
 async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle button callbacks"""
     query = update.callback_query
@@ -231,11 +263,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     callback_data = query.data
 
     # Check if contact was verified
-    @sync_to_async
-    def has_shared_contact():
-        return ContactVerification.objects.filter(telegram_id=telegram_id).exists()
-
-    if not await has_shared_contact():
+    if not await verified_contacts.is_verified(telegram_id):
         await query.message.reply_text(
             "⚠️ Please share your contact first to use this bot.\n\n"
             "Use /start to begin.",
@@ -247,6 +275,10 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if callback_data.startswith("role_"):
         await handle_role_selection(query, telegram_id, callback_data)
 
+    # List pagination
+    elif callback_data.startswith("pg:"):
+        await handle_page(query, telegram_id, callback_data)
+
     # Main menu actions
     elif callback_data.startswith("menu_"):
         await handle_menu_selection(query, telegram_id, callback_data)
@@ -392,32 +424,14 @@ async def handle_menu_selection(query, telegram_id, callback_data):
         return
 
     if callback_data == "menu_available_tasks":
-        tasks = await get_available_tasks()
-        await query.edit_message_text(
-            f"<b>Available Tasks</b> ({len(tasks)} tasks)\n\n"
-            f"Select a task to view details:",
-            parse_mode="HTML",
-            reply_markup=get_task_list_keyboard(tasks, prefix="task"),
-        )
+        await show_available_tasks(query)
 
     elif callback_data == "menu_my_tasks":
-        if user["role"] == Role.WORKER:
-            tasks = await get_tasks_by_worker(user["id"])
-            title = "My Assigned Tasks"
-        else:  # Supervisor
-            tasks = await get_tasks_by_supervisor(user["id"])
-            title = "My Created Tasks"
-
-        await query.edit_message_text(
-            f"<b>{title}</b> ({len(tasks)} tasks)\n\n"
-            f"Select a task to view details:",
-            parse_mode="HTML",
-            reply_markup=get_task_list_keyboard(tasks, prefix="task"),
-        )
+        await show_my_tasks(query, user)
 
     elif callback_data == "menu_profile":
         # Generate auth token for WebApp
-        @sync_to_async
+        @database_sync_to_async
         def get_user_phone():
             try:
                 user_obj = User.objects.get(telegram_id=telegram_id)
@@ -465,24 +479,104 @@ async def handle_menu_selection(query, telegram_id, callback_data):
         )
 
     elif callback_data == "menu_view_workers":
-        # TODO: Implement search and pagination
-        workers = await get_all_workers()
-        await query.edit_message_text(
-            f"<b>Available Workers</b> ({len(workers)} workers)\n\n"
-            f"Select a worker to view profile:",
-            parse_mode="HTML",
-            reply_markup=get_worker_list_keyboard(workers),
-        )
+        # TODO: Implement search
+        await show_workers(query)
 
     elif callback_data == "menu_history":
-        tasks = await get_tasks_by_worker(user["id"])
-        completed_tasks = [t for t in tasks if t["status"] == "COMPLETED"]
-        await query.edit_message_text(
-            f"<b>Task History</b> ({len(completed_tasks)} completed)\n\n"
-            f"Select a task to view details:",
-            parse_mode="HTML",
-            reply_markup=get_task_list_keyboard(completed_tasks, prefix="task"),
-        )
+        await show_task_history(query, user)
+
+
+async def handle_page(query, telegram_id, callback_data):
+    """Show another page of a task or worker list"""
+    name, arg, backward, cursor = parse_page_callback(callback_data)
+
+    if name == "open":
+        await show_available_tasks(query, cursor, backward)
+    elif name == "workers":
+        await show_workers(query, cursor, backward)
+    elif name == "assign":
+        await show_assign_workers(query, int(arg), cursor, backward)
+    else:
+        user = await get_user_by_telegram_id(telegram_id)
+        if not user:
+            await query.edit_message_text("Please use /start to register first!")
+        elif name == "mine":
+            await show_my_tasks(query, user, cursor, backward)
+        elif name == "hist":
+            await show_task_history(query, user, cursor, backward)
+
+
+async def show_available_tasks(query, cursor=None, backward=False):
+    page = await get_task_page(cursor, backward, status=Task.OPEN)
+    await query.edit_message_text(
+        "<b>Available Tasks</b>\n\nSelect a task to view details:",
+        parse_mode="HTML",
+        reply_markup=get_task_list_keyboard(
+            page["items"], prefix="task", pagination=get_pagination_row(page, "open")
+        ),
+    )
+
+
+async def show_my_tasks(query, user, cursor=None, backward=False):
+    if user["role"].lower() == Role.WORKER:
+        page = await get_task_page(cursor, backward, assigned_to_id=user["id"])
+        title = "My Assigned Tasks"
+    else:  # Supervisor
+        page = await get_task_page(cursor, backward, created_by_id=user["id"])
+        title = "My Created Tasks"
+
+    task_summary = await get_task_summary(user["id"], user["role"])
+    counts = task_summary["by_status"]
+    await query.edit_message_text(
+        f"<b>{title}</b> ({task_summary['total']} tasks)\n"
+        f"🟡 {counts['assigned']} assigned · 🔵 {counts['in_progress']} in progress"
+        f" · ✅ {counts['completed']} completed\n\n"
+        f"Select a task to view details:",
+        parse_mode="HTML",
+        reply_markup=get_task_list_keyboard(
+            page["items"], prefix="task", pagination=get_pagination_row(page, "mine")
+        ),
+    )
+
+
+async def show_task_history(query, user, cursor=None, backward=False):
+    page = await get_task_page(
+        cursor, backward, assigned_to_id=user["id"], status=Task.COMPLETED
+    )
+    task_summary = await get_task_summary(user["id"], user["role"])
+    await query.edit_message_text(
+        f"<b>Task History</b> ({task_summary['by_status']['completed']} completed)\n\n"
+        f"Select a task to view details:",
+        parse_mode="HTML",
+        reply_markup=get_task_list_keyboard(
+            page["items"], prefix="task", pagination=get_pagination_row(page, "hist")
+        ),
+    )
+
+
+async def show_workers(query, cursor=None, backward=False):
+    page = await get_worker_page(cursor, backward)
+    await query.edit_message_text(
+        "<b>Available Workers</b>\n\nSelect a worker to view profile:",
+        parse_mode="HTML",
+        reply_markup=get_worker_list_keyboard(
+            page["items"], pagination=get_pagination_row(page, "workers")
+        ),
+    )
+
+
+async def show_assign_workers(query, task_id, cursor=None, backward=False):
+    page = await get_worker_page(cursor, backward)
+    await query.edit_message_text(
+        f"<b>Select a worker for Task #{task_id}</b>\n\n"
+        f"Choose from available workers:",
+        parse_mode="HTML",
+        reply_markup=get_assign_worker_keyboard(
+            page["items"],
+            task_id,
+            pagination=get_pagination_row(page, "assign", task_id),
+        ),
+    )
 
 
 async def handle_task_detail(query, telegram_id, callback_data):
@@ -510,11 +604,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     text = update.message.text
 
     # Check if contact was verified
-    @sync_to_async
-    def has_shared_contact():
-        return ContactVerification.objects.filter(telegram_id=telegram_id).exists()
-
-    if not await has_shared_contact():
+    if not await verified_contacts.is_verified(telegram_id):
         await update.message.reply_text(
             "⚠️ Please share your contact first to use this bot.\n\n"
             "Use /start to begin.",
@@ -606,7 +696,7 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
         try:
 
-            @sync_to_async
+            @database_sync_to_async
             def update_rating_comment():
                 task = Task.objects.get(id=task_id)
                 if hasattr(task, "rating"):
@@ -629,12 +719,12 @@ async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 task = await get_task_detail(task_id)
 
                 if task and task.get("assigned_to"):
-                    worker = await sync_to_async(User.objects.get)(
+                    worker = await database_sync_to_async(User.objects.get)(
                         id=task["assigned_to"]
                     )
                     if worker.telegram_id:
                         # Get the rating to include score and comment
-                        @sync_to_async
+                        @database_sync_to_async
                         def get_rating_info():
                             task_obj = Task.objects.get(id=task_id)
                             if hasattr(task_obj, "rating"):
@@ -745,21 +835,15 @@ async def handle_category_selection(query, telegram_id, callback_data):
 async def handle_show_workers_for_assignment(query, telegram_id, callback_data):
     """Show list of workers to assign a task"""
     task_id = int(callback_data.replace("assign_task_", ""))
-    workers = await get_all_workers()
-
-    await query.edit_message_text(
-        f"<b>Select a worker for Task #{task_id}</b>\n\n"
-        f"Choose from available workers:",
-        parse_mode="HTML",
-        reply_markup=get_assign_worker_keyboard(workers, task_id),
-    )
+    await show_assign_workers(query, task_id)
 
 
 async def handle_assign_task(query, telegram_id, callback_data):
     """Handle task assignment to worker"""
     parts = callback_data.split("_")
     task_id = int(parts[2])
-    worker_id = int(parts[3])
+    # Worker ids are UUIDs
+    worker_id = parts[3]
 
     result = await assign_task(task_id, worker_id)
 
@@ -808,7 +892,7 @@ async def handle_decline_task(query, telegram_id, callback_data):
         if task.get("created_by"):
 
             try:
-                supervisor = await sync_to_async(User.objects.get)(
+                supervisor = await database_sync_to_async(User.objects.get)(
                     id=task["created_by"]
                 )
                 if supervisor.telegram_id:
@@ -842,7 +926,7 @@ async def handle_complete_task(query, telegram_id, callback_data):
     task_id = int(callback_data.replace("complete_task_", ""))
     user = await get_user_by_telegram_id(telegram_id)
 
-    if user["role"] == Role.WORKER:
+    if user["role"].lower() == Role.WORKER:
         result = await update_task_status(task_id, "SUBMITTED")
         message = "Task submitted for review!"
     else:
@@ -0,0 +1,88 @@
+"""
+In-process cache of Telegram users who have shared their contact.
+
+Every handler checks the contact gate before doing anything else. The cache
+is warmed with all verified ids when the bot starts and updated by
+``handle_contact``, so the check normally costs no database round trip.
+Entries expire after ``TELEGRAM_CONTACT_CACHE_TTL`` seconds (default 300) and
+are then confirmed against the database again, which picks up verifications
+removed or added by another process. Users without a verification are
+remembered for a shorter time, and only the most recent
+``TELEGRAM_CONTACT_CACHE_MAX_UNVERIFIED`` of them (default 10000), so
+repeated messages from them don't hit the database on every update either.
+Saving a contact replaces that answer straight away.
+"""
+
+import logging
+import time
+
+from django.conf import settings
+
+from core.cache import MISSING, LocalLRU
+from telegram_bot import metrics
+from telegram_bot.db import database_sync_to_async
+from telegram_bot.models import ContactVerification
+
+logger = logging.getLogger(__name__)
+
+
+class VerifiedContactCache:
+    def __init__(self, ttl=None, negative_ttl=30, max_unverified=None):
+        self.ttl = ttl or getattr(settings, "TELEGRAM_CONTACT_CACHE_TTL", 300)
+        self.negative_ttl = negative_ttl
+        # telegram_id -> monotonic expiry
+        self._verified = {}
+        # Anyone can message the bot, so this one is bounded
+        self._unverified = LocalLRU(
+            max_unverified
+            or getattr(settings, "TELEGRAM_CONTACT_CACHE_MAX_UNVERIFIED", 10000)
+        )
+
+    def warm(self):
+        """Load every verified id with a single query"""
+        expires = time.monotonic() + self.ttl
+        ids = ContactVerification.objects.values_list("telegram_id", flat=True)
+        self._verified = {telegram_id: expires for telegram_id in ids.iterator()}
+        self._unverified.clear()
+        logger.info(f"Loaded {len(self._verified)} verified contacts")
+        return len(self._verified)
+
+    def add(self, telegram_id):
+        self._verified[telegram_id] = time.monotonic() + self.ttl
+        self._unverified.delete(telegram_id)
+
+    def discard(self, telegram_id):
+        self._verified.pop(telegram_id, None)
+        self._unverified.delete(telegram_id)
+
+    def lookup(self, telegram_id):
+        """True/False from the cache, or None when the answer has expired"""
+        now = time.monotonic()
+        if self._verified.get(telegram_id, 0) > now:
+            return True
+        if self._unverified.get(telegram_id) is not MISSING:
+            return False
+        return None
+
+    async def is_verified(self, telegram_id):
+        cached = self.lookup(telegram_id)
+        if cached is not None:
+            metrics.incr("contact_cache.hit")
+            return cached
+
+        metrics.incr("contact_cache.miss")
+        verified = await database_sync_to_async(
+            ContactVerification.objects.filter(telegram_id=telegram_id).exists
+        )()
+        if verified:
+            self.add(telegram_id)
+        elif self._verified.get(telegram_id, 0) > time.monotonic():
+            # The contact was saved while the query ran
+            return True
+        else:
+            self._verified.pop(telegram_id, None)
+            self._unverified.set(telegram_id, True, self.negative_ttl)
+        return verified
+
+
+verified_contacts = VerifiedContactCache()
@@ -0,0 +1,94 @@
+"""
+Database access for bot handlers.
+
+``sync_to_async`` runs functions on one shared thread by default, so every
+query from every chat waits for the one before it, and concurrent update
+processing gains nothing while handlers talk to the database. Django's
+async ORM methods (``aget``, ``acount``, ...) are wrappers around the same
+thread, so they don't help either.
+
+``database_sync_to_async`` runs functions on a dedicated pool of
+``TELEGRAM_DB_POOL_SIZE`` threads (default 8) instead. Each thread keeps its
+own database connection open between calls, like the single bot thread did
+before, so the pool size is also the most connections a bot process opens. SQLite
+allows one writer at a time and answers concurrent transactions that both
+want to write with "database is locked", so on SQLite the pool has a
+single thread.
+Before each call, connections that raised an error and no longer respond,
+or that are older than ``CONN_MAX_AGE`` when that is set, are closed and
+reopened on demand.
+
+A function must finish its transaction within the call, as consecutive
+calls may run on different threads. Queries made through the pool are
+counted in the ``db.queries`` metric and timed in ``db.query_seconds``, and
+are added to the current handler's numbers (see ``instrumentation``).
+"""
+
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, connections
+
+from telegram_bot.instrumentation import record_query
+
+_executor = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                size = getattr(settings, "TELEGRAM_DB_POOL_SIZE", 8)
+                if connection.vendor == "sqlite":
+                    size = 1
+                _executor = ThreadPoolExecutor(
+                    max_workers=size, thread_name_prefix="bot-db"
+                )
+    return _executor
+
+
+def prepare_connections():
+    """Close this thread's connections that are broken or past CONN_MAX_AGE"""
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is None:
+            continue
+        if conn.errors_occurred:
+            if not conn.is_usable():
+                conn.close()
+                continue
+            conn.errors_occurred = False
+        max_age = conn.settings_dict["CONN_MAX_AGE"]
+        if max_age and conn.close_at is not None and time.monotonic() >= conn.close_at:
+            conn.close()
+
+
+def count_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        record_query(time.perf_counter() - start)
+
+
+def _call(func, *args, **kwargs):
+    prepare_connections()
+    with connection.execute_wrapper(count_query):
+        return func(*args, **kwargs)
+
+
+def database_sync_to_async(func):
+    """Like ``sync_to_async``, but runs ``func`` on the bot's database pool"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await sync_to_async(
+            _call, thread_sensitive=False, executor=get_executor()
+        )(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,237 @@
+"""
+Minimal local stand-in for the Telegram Bot API, used by benchmarks.
+
+Run it in-process and point a ``Bot`` at ``server.base_url``:
+
+    with FakeTelegramAPI(latency=0.02) as server:
+        bot = Bot(token="1:x", base_url=server.base_url)
+
+Every request is answered with a plausible ``ok`` result after ``latency``
+seconds. The server keeps HTTP/1.1 connections alive and counts requests
+per method and the number of TCP connections accepted, so clients that
+reuse connections can be told apart from ones that reconnect every time.
+
+``errors`` maps a chat id to a Bot API error answer, for example
+``{"error_code": 403, "description": "Forbidden: bot was blocked by the user"}``;
+messages to that chat fail with it instead of being recorded.
+
+Updates queued with ``push_update`` are served to ``getUpdates``, which
+long-polls like the real API, so an ``Application`` can run ``start_polling``
+against the server.
+
+``on_send`` is called from the server thread with the parameters of every
+message sent or edited, which lets harnesses time replies. ``message_update``
+and ``callback_update`` build the JSON Telegram would deliver for a user
+action, for feeding synthetic updates to the bot.
+"""
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl
+
+BOT_USER = {
+    "id": 1,
+    "is_bot": True,
+    "first_name": "Fake",
+    "username": "fake_bot",
+}
+
+
+def _user(user_id):
+    return {"id": user_id, "is_bot": False, "first_name": f"User {user_id}"}
+
+
+def message_update(update_id, user_id, text):
+    """Update JSON for a private text message, with a command entity if needed"""
+    message = {
+        "message_id": update_id,
+        "date": int(time.time()),
+        "chat": {"id": user_id, "type": "private"},
+        "from": _user(user_id),
+        "text": text,
+    }
+    if text.startswith("/"):
+        command = text.split()[0]
+        message["entities"] = [
+            {"type": "bot_command", "offset": 0, "length": len(command)}
+        ]
+    return {"update_id": update_id, "message": message}
+
+
+def contact_update(update_id, user_id, phone_number):
+    """Update JSON for a user sharing their own contact"""
+    update = message_update(update_id, user_id, "")
+    message = update["message"]
+    del message["text"]
+    message["contact"] = {
+        "phone_number": phone_number,
+        "first_name": f"User {user_id}",
+        "user_id": user_id,
+    }
+    return update
+
+
+def callback_update(update_id, user_id, data, message_id=1):
+    """Update JSON for an inline keyboard button press"""
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "from": _user(user_id),
+            "chat_instance": str(user_id),
+            "data": data,
+            "message": {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": user_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "Menu",
+            },
+        },
+    }
+
+
+def _param(value):
+    # PTB JSON-encodes non-string values inside form posts
+    try:
+        return json.loads(value)
+    except (TypeError, ValueError):
+        return value
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, delayed ACKs
+    # add ~40 ms to every response on a kept-alive connection
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.api.record_connection()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length).decode() if length else ""
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            params = json.loads(body or "{}")
+        else:
+            params = {key: _param(value) for key, value in parse_qsl(body)}
+
+        method = self.path.rstrip("/").rsplit("/", 1)[-1]
+        status, answer = self.server.api.handle(method, params)
+
+        payload = json.dumps(answer).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client gave up, e.g. a long poll cut short on shutdown
+            self.close_connection = True
+
+    do_GET = do_POST
+
+
+class FakeTelegramAPI:
+    def __init__(
+        self, host="127.0.0.1", port=0, latency=0.0, errors=None, on_send=None
+    ):
+        self.latency = latency
+        self.errors = errors or {}
+        self.on_send = on_send
+        self.requests = Counter()
+        self.connections = 0
+        self.sent = []
+
+        self._lock = threading.Lock()
+        self._message_id = 0
+        self._updates = []
+        self._has_updates = threading.Condition(self._lock)
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.api = self
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/bot"
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def push_update(self, update):
+        with self._has_updates:
+            self._updates.append(update)
+            self._has_updates.notify_all()
+
+    def get_updates(self, params):
+        offset = int(params.get("offset") or 0)
+        limit = int(params.get("limit") or 100)
+        timeout = min(float(params.get("timeout") or 0), 5.0)
+        with self._has_updates:
+            # Confirmed updates are dropped, as Telegram does
+            self._updates = [u for u in self._updates if u["update_id"] >= offset]
+            if not self._updates and timeout:
+                self._has_updates.wait(timeout)
+            return self._updates[:limit]
+
+    def handle(self, method, params):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self._lock:
+            self.requests[method] += 1
+
+        error = self.errors.get(params.get("chat_id"))
+        if error:
+            return error["error_code"], {"ok": False, **error}
+        return 200, {"ok": True, "result": self.result(method, params)}
+
+    def result(self, method, params):
+        if method == "getMe":
+            return BOT_USER
+        if method == "getUpdates":
+            return self.get_updates(params)
+        if method in ("sendMessage", "editMessageText"):
+            with self._lock:
+                self._message_id += 1
+                message_id = self._message_id
+                self.sent.append(params)
+            if self.on_send:
+                self.on_send(params)
+            return {
+                "message_id": message_id,
+                "date": int(time.time()),
+                "chat": {"id": params.get("chat_id"), "type": "private"},
+                "from": BOT_USER,
+                "text": params.get("text", ""),
+            }
+        return True
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-telegram", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
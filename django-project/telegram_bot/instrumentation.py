@@ -0,0 +1,117 @@
+"""
+Timing for bot handlers, database queries and Bot API calls.
+
+``instrument`` wraps a handler callback and records, labelled by handler
+(and by callback route for ``button_callback``):
+
+- ``handler.seconds``: how long the handler ran;
+- ``handler.errors``: how many calls raised;
+- ``handler.db_queries`` and ``handler.db_seconds``: queries made while
+  handling the update and the time spent in them;
+- ``handler.api_calls`` and ``handler.api_seconds``: the same for Bot API
+  requests.
+
+Queries are attributed through ``current_update``, which the database pool
+threads see because ``sync_to_async`` copies the caller's context.
+``InstrumentedRequest`` times every Bot API request by method in
+``telegram_api.seconds`` and counts failed requests and error responses in
+``telegram_api.errors``.
+"""
+
+import functools
+import time
+from contextvars import ContextVar
+
+from telegram.ext import ApplicationHandlerStop
+from telegram.request import HTTPXRequest
+
+from telegram_bot import metrics
+
+current_update = ContextVar("current_update", default=None)
+
+
+class UpdateStats:
+    __slots__ = ("queries", "query_seconds", "api_calls", "api_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.api_calls = 0
+        self.api_seconds = 0.0
+
+
+def instrument(name, callback, route=None):
+    """
+    Wrap a handler callback to record its metrics under ``handler=name``.
+
+    ``route``, if given, is called with the update and its result is added
+    as the ``route`` label.
+    """
+
+    @functools.wraps(callback)
+    async def wrapper(update, context):
+        labels = {"handler": name}
+        if route is not None:
+            labels["route"] = route(update)
+        stats = UpdateStats()
+        token = current_update.set(stats)
+        start = time.perf_counter()
+        try:
+            return await callback(update, context)
+        except ApplicationHandlerStop:
+            raise
+        except Exception:
+            metrics.incr("handler.errors", **labels)
+            raise
+        finally:
+            current_update.reset(token)
+            metrics.observe("handler.seconds", time.perf_counter() - start, **labels)
+            metrics.observe(
+                "handler.db_queries",
+                stats.queries,
+                buckets=metrics.COUNT_BUCKETS,
+                **labels,
+            )
+            metrics.observe("handler.db_seconds", stats.query_seconds, **labels)
+            metrics.observe(
+                "handler.api_calls",
+                stats.api_calls,
+                buckets=metrics.COUNT_BUCKETS,
+                **labels,
+            )
+            metrics.observe("handler.api_seconds", stats.api_seconds, **labels)
+
+    return wrapper
+
+
+def record_query(seconds):
+    metrics.incr("db.queries")
+    metrics.observe("db.query_seconds", seconds)
+    stats = current_update.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += seconds
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """``HTTPXRequest`` that records the latency of every Bot API call"""
+
+    async def do_request(self, url, method, *args, **kwargs):
+        api_method = url.rsplit("/", 1)[-1]
+        start = time.perf_counter()
+        try:
+            status, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            metrics.incr("telegram_api.errors", method=api_method)
+            raise
+        else:
+            if status >= 400:
+                metrics.incr("telegram_api.errors", method=api_method)
+            return status, payload
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.observe("telegram_api.seconds", elapsed, method=api_method)
+            stats = current_update.get()
+            if stats is not None:
+                stats.api_calls += 1
+                stats.api_seconds += elapsed
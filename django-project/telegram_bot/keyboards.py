@@ -5,6 +5,7 @@ from telegram import (
     KeyboardButton,
 )
 from work_management.models import Role
+from telegram_bot.paging import page_callback
 
 
 def get_contact_request_keyboard():
@@ -51,7 +52,25 @@ def get_task_categories_keyboard():
     assert False, "TODO: get_task_categories_keyboard() is not implemented yet"
 
 
-def get_task_list_keyboard(tasks, prefix="task"):
+def get_pagination_row(page, name, arg=""):
+    """Previous/next buttons for a page from ``telegram_bot.paging``"""
+    row = []
+    if page["prev"]:
+        row.append(
+            InlineKeyboardButton(
+                "⬅️ Previous", callback_data=page_callback(name, arg, "p", page["prev"])
+            )
+        )
+    if page["next"]:
+        row.append(
+            InlineKeyboardButton(
+                "Next ➡️", callback_data=page_callback(name, arg, "n", page["next"])
+            )
+        )
+    return row
+
+
+def get_task_list_keyboard(tasks, prefix="task", pagination=None):
     """Generate keyboard with list of tasks"""
     keyboard = []
     for task in tasks:
@@ -74,6 +93,9 @@ def get_task_list_keyboard(tasks, prefix="task"):
             [InlineKeyboardButton("No tasks available", callback_data="none")]
         )
 
+    if pagination:
+        keyboard.append(pagination)
+
     keyboard.append(
         [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")]
     )
@@ -154,7 +176,7 @@ def get_task_detail_keyboard(task, user_role):
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_worker_list_keyboard(workers):
+def get_worker_list_keyboard(workers, pagination=None):
     """Generate keyboard with list of workers"""
     keyboard = []
     for worker in workers:
@@ -170,13 +192,16 @@ def get_worker_list_keyboard(workers):
             [InlineKeyboardButton("No workers available", callback_data="none")]
         )
 
+    if pagination:
+        keyboard.append(pagination)
+
     keyboard.append(
         [InlineKeyboardButton("🔙 Back to Menu", callback_data="back_to_menu")]
     )
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_assign_worker_keyboard(workers, task_id):
+def get_assign_worker_keyboard(workers, task_id, pagination=None):
     """Keyboard for assigning a task to a worker"""
     keyboard = []
     for worker in workers:
@@ -191,6 +216,9 @@ def get_assign_worker_keyboard(workers, task_id):
             ]
         )
 
+    if pagination:
+        keyboard.append(pagination)
+
     keyboard.append(
         [InlineKeyboardButton("❌ Cancel", callback_data=f"task_{task_id}")]
     )
@@ -0,0 +1,87 @@
+"""
+Benchmark bot database helpers at increasing concurrency.
+
+Usage:
+    python manage.py benchmark_bot_db
+    python manage.py benchmark_bot_db --queries 1000 --concurrency 1,8,32 --query-delay-ms 2
+
+Runs the user lookup behind ``get_user_by_telegram_id`` from many coroutines
+at once, first through ``sync_to_async`` on its default shared thread, then
+through the bot's database pool (``database_sync_to_async``), and reports
+lookups per second for each concurrency level. Lookups are read only.
+
+A local SQLite database answers far faster than a database server across
+the network, which hides the difference; --query-delay-ms adds that round
+trip to every query.
+"""
+
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from telegram_bot.db import database_sync_to_async
+from telegram_bot.utils import load_user_by_telegram_id
+
+FIRST_USER_ID = 700_000_000
+
+
+class Command(BaseCommand):
+    help = "Compare the shared sync_to_async thread with the bot database pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queries", type=int, default=500)
+        parser.add_argument("--concurrency", default="1,4,8,16,32")
+        parser.add_argument(
+            "--query-delay-ms",
+            type=float,
+            default=2,
+            help="Simulated network round trip per query",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(value) for value in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency takes numbers like 1,8,32")
+
+        delay = options["query_delay_ms"] / 1000
+        lookup = load_user_by_telegram_id.__wrapped__
+
+        def slow_network(execute, sql, params, many, context):
+            time.sleep(delay)
+            return execute(sql, params, many, context)
+
+        def query(telegram_id):
+            with connection.execute_wrapper(slow_network):
+                return lookup(telegram_id)
+
+        self.stdout.write(
+            f"{options['queries']} lookups per run, "
+            f"{options['query_delay_ms']} ms added per query, "
+            f"pool of {getattr(settings, 'TELEGRAM_DB_POOL_SIZE', 8)} threads"
+        )
+        for level in levels:
+            shared = asyncio.run(self.run(sync_to_async(query), level, options))
+            pooled = asyncio.run(
+                self.run(database_sync_to_async(query), level, options)
+            )
+            self.stdout.write(
+                f"concurrency {level:>3}: shared thread {shared:7.0f}/s, "
+                f"pool {pooled:7.0f}/s ({pooled / shared:.1f}x)"
+            )
+        self.stdout.write(self.style.SUCCESS("Done"))
+
+    async def run(self, query, level, options):
+        limit = asyncio.Semaphore(level)
+
+        async def lookup(index):
+            async with limit:
+                await query(FIRST_USER_ID + index)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(lookup(index) for index in range(options["queries"])))
+        return options["queries"] / (time.perf_counter() - start)
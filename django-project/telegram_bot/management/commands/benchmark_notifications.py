@@ -0,0 +1,94 @@
+"""
+Benchmark notification throughput against a local fake Telegram API.
+
+Usage:
+    python manage.py benchmark_notifications
+    python manage.py benchmark_notifications --messages 1000 --threads 16 --latency-ms 20
+
+Sends the same messages twice from a pool of threads, each going through
+async_to_sync the way the API views do: first building a new Bot for every
+message (the old behaviour), then through a shared TelegramNotifier. Reports
+messages per second and how many TCP connections each approach opened.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from telegram import Bot
+
+from telegram_bot.fake_api import FakeTelegramAPI
+from telegram_bot.notifier import TelegramNotifier
+
+TOKEN = "123456:benchmark"
+
+
+class Command(BaseCommand):
+    help = "Compare per-message Bot clients with the shared notifier"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=500)
+        parser.add_argument(
+            "--threads", type=int, default=8, help="Concurrent sending threads"
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0,
+            help="Simulated Telegram response time",
+        )
+        parser.add_argument(
+            "--pool-size", type=int, default=8, help="Notifier connection pool size"
+        )
+
+    def handle(self, *args, **options):
+        with FakeTelegramAPI(latency=options["latency_ms"] / 1000) as server:
+
+            async def send_with_new_bot(chat_id, text):
+                bot = Bot(token=TOKEN, base_url=server.base_url)
+                await bot.send_message(chat_id=chat_id, text=text)
+
+            before = self.run(server, send_with_new_bot, options)
+            self.report("New Bot per message", before, options["messages"])
+
+            notifier = TelegramNotifier(
+                token=TOKEN,
+                base_url=server.base_url,
+                pool_size=options["pool_size"],
+            )
+
+            async def send_with_notifier(chat_id, text):
+                await notifier.send_message(chat_id=chat_id, text=text)
+
+            try:
+                after = self.run(server, send_with_notifier, options)
+            finally:
+                notifier.close()
+            self.report("Shared notifier", after, options["messages"])
+
+        speedup = before[0] / after[0] if after[0] else float("inf")
+        self.stdout.write(self.style.SUCCESS(f"Speedup: {speedup:.1f}x"))
+
+    def run(self, server, send, options):
+        server.connections = 0
+        sync_send = async_to_sync(send)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            futures = [
+                pool.submit(sync_send, chat_id=1000 + i % 50, text=f"Message {i}")
+                for i in range(options["messages"])
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        return elapsed, server.connections
+
+    def report(self, label, result, messages):
+        elapsed, connections = result
+        self.stdout.write(
+            f"{label}: {messages} messages in {elapsed:.2f}s "
+            f"({messages / elapsed:.0f}/s), {connections} connections"
+        )
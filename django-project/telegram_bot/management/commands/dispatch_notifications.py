@@ -0,0 +1,78 @@
+"""
+Deliver queued Telegram notifications from the notification outbox.
+
+Usage:
+    python manage.py dispatch_notifications            # run forever
+    python manage.py dispatch_notifications --once     # drain what is due and exit
+
+Sends are limited to --rate messages per second overall and one message per
+chat every --per-chat-interval seconds. Failed sends are retried with
+exponential backoff; delivered rows are purged after --keep-days.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from telegram_bot.outbox import OutboxDispatcher
+
+
+class Command(BaseCommand):
+    help = "Deliver queued Telegram notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Drain due notifications and exit"
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--rate", type=float, default=25, help="Messages per second overall"
+        )
+        parser.add_argument(
+            "--per-chat-interval",
+            type=float,
+            default=1.0,
+            help="Minimum seconds between messages to the same chat",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Pause when nothing is due, in seconds",
+        )
+        parser.add_argument(
+            "--keep-days",
+            type=int,
+            default=7,
+            help="How long delivered notifications are kept",
+        )
+
+    def handle(self, *args, **options):
+        dispatcher = OutboxDispatcher(
+            batch_size=options["batch_size"],
+            global_rate=options["rate"],
+            per_chat_interval=options["per_chat_interval"],
+        )
+
+        if options["once"]:
+            total = 0
+            while claimed := dispatcher.run_once():
+                total += claimed
+            self.stdout.write(self.style.SUCCESS(f"Processed {total} notifications"))
+            return
+
+        self.stdout.write("Notification dispatcher started")
+        last_purge = None
+        try:
+            while True:
+                if not dispatcher.run_once():
+                    time.sleep(options["poll_interval"])
+
+                now = timezone.now()
+                if last_purge is None or now - last_purge > timedelta(hours=1):
+                    dispatcher.purge(now - timedelta(days=options["keep_days"]))
+                    last_purge = now
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("\nNotification dispatcher stopped"))
@@ -0,0 +1,137 @@
+"""
+Load test the bot's update processing with thousands of simulated chats.
+
+Usage:
+    python manage.py loadtest_bot
+    python manage.py loadtest_bot --chats 5000 --updates-per-chat 3 --concurrency 1,32,128
+
+Builds the real application against a local FakeTelegramAPI and queues
+/start messages from --chats users, interleaved the way they would arrive.
+Each --concurrency value is one run with that many handlers allowed at once;
+1 is the old one-update-at-a-time behaviour. For every run the command
+reports throughput and p50/p99 of the time updates waited for their turn,
+the time their handler ran, and the two together, and checks that every
+chat's updates were handled in the order they arrived.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from telegram import Update
+
+from telegram_bot import metrics
+from telegram_bot.application import build_application
+from telegram_bot.fake_api import FakeTelegramAPI, message_update
+from telegram_bot.scheduler import ChatOrderedUpdateProcessor
+
+TOKEN = "123456:loadtest"
+FIRST_USER_ID = 800_000_000
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Measure update latency with many concurrent chats"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chats", type=int, default=2000)
+        parser.add_argument("--updates-per-chat", type=int, default=2)
+        parser.add_argument(
+            "--concurrency",
+            default="1,32",
+            help="Comma separated handler limits to compare",
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=5,
+            help="Simulated Telegram response time",
+        )
+        parser.add_argument(
+            "--max-wait",
+            type=float,
+            default=0,
+            help="Drop updates that waited longer than this (0 keeps all)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            limits = [int(value) for value in options["concurrency"].split(",")]
+        except ValueError:
+            raise CommandError("--concurrency takes numbers like 1,32,128")
+
+        # Per-update request and handler logs would dominate the run
+        for name in ("httpx", "telegram_bot.bot"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        with FakeTelegramAPI(latency=options["latency_ms"] / 1000) as server:
+            for limit in limits:
+                asyncio.run(self.run(server, limit, options))
+
+    async def run(self, server, limit, options):
+        waits, durations, order = [], [], defaultdict(list)
+
+        def observe(update, waited, duration):
+            waits.append(waited)
+            durations.append(duration)
+            order[update.effective_chat.id].append(update.update_id)
+
+        total = options["chats"] * options["updates_per_chat"]
+        processor = ChatOrderedUpdateProcessor(
+            max_running=limit,
+            max_pending=total,
+            max_wait=options["max_wait"],
+            observe=observe,
+        )
+        application = build_application(
+            TOKEN, base_url=server.base_url, updater=False, processor=processor
+        )
+        shed_before = metrics.counters["updates.shed"]
+
+        await application.initialize()
+        await application.start()
+        try:
+            start = time.perf_counter()
+            update_id = 0
+            for _ in range(options["updates_per_chat"]):
+                for chat in range(options["chats"]):
+                    update_id += 1
+                    data = message_update(update_id, FIRST_USER_ID + chat, "/start")
+                    await application.update_queue.put(
+                        Update.de_json(data, application.bot)
+                    )
+            await application.update_queue.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            await application.stop()
+            await application.shutdown()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Concurrency {limit}: {len(durations)} updates in {elapsed:.2f}s "
+                f"({len(durations) / elapsed:.0f}/s), "
+                f"{metrics.counters['updates.shed'] - shed_before} dropped"
+            )
+        )
+        if durations:
+            totals = [wait + duration for wait, duration in zip(waits, durations)]
+            self.report("  waiting", waits)
+            self.report("  handler", durations)
+            self.report("  total", totals)
+
+        out_of_order = [ids for ids in order.values() if ids != sorted(ids)]
+        if out_of_order:
+            raise CommandError(f"{len(out_of_order)} chats handled out of order")
+        self.stdout.write(f"  per-chat order kept for {len(order)} chats")
+
+    def report(self, label, values):
+        self.stdout.write(
+            f"{label}: p50 {percentile(values, 0.5) * 1000:.1f} ms, "
+            f"p99 {percentile(values, 0.99) * 1000:.1f} ms"
+        )
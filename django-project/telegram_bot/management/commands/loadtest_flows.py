@@ -0,0 +1,241 @@
+"""
+Drive the bot with scripted user flows against a local fake Telegram API.
+
+Usage:
+    python manage.py loadtest_flows
+    python manage.py loadtest_flows --pairs 2000 --concurrency 200 --latency-ms 20
+    python manage.py loadtest_flows --settings=config.settings.dev --keep-data
+
+Runs fully offline against the configured database (SQLite or a local
+Postgres). The command seeds --pairs supervisor/worker pairs, each with one
+open task, then starts the real bot application polling FakeTelegramAPI
+through getUpdates. Every pair plays this script, one step at a time, with
+--concurrency pairs active at once:
+
+    both share their contact
+    supervisor: /start, view workers, pick a worker for the task
+    worker: available tasks, open the task, start it, submit it
+    supervisor: mark it complete, rate it
+
+Each step is timed from the moment the update is queued at the fake API
+until its handler finished. The report gives throughput, p50/p95/p99 per
+step, database queries per update and the Bot API calls made, and checks
+that every task ended up completed and rated. Seeded rows are deleted
+afterwards unless --keep-data is given.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from telegram_bot import metrics
+from telegram_bot.application import build_application
+from telegram_bot.fake_api import (
+    FakeTelegramAPI,
+    callback_update,
+    contact_update,
+    message_update,
+)
+from telegram_bot.models import ContactVerification, ConversationState
+from telegram_bot.scheduler import ChatOrderedUpdateProcessor
+from work_management.models import SupervisorProfile, Task
+from workers.users_models import CustomUser as User, WorkerProfile
+
+TOKEN = "123456:loadtest"
+FIRST_TELEGRAM_ID = 600_000_000
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def seed(pairs):
+    """Create supervisor/worker pairs with one open task each"""
+    supervisors, workers = [], []
+    for index in range(pairs):
+        telegram_id = FIRST_TELEGRAM_ID + 2 * index
+        supervisors.append(
+            User(
+                email=f"{telegram_id}@loadtest.invalid",
+                telegram_id=telegram_id,
+                full_name=f"Supervisor {index}",
+                user_type="supervisor",
+            )
+        )
+        workers.append(
+            User(
+                email=f"{telegram_id + 1}@loadtest.invalid",
+                telegram_id=telegram_id + 1,
+                full_name=f"Worker {index}",
+                user_type="worker",
+            )
+        )
+    User.objects.bulk_create(supervisors + workers)
+    SupervisorProfile.objects.bulk_create(
+        [SupervisorProfile(user=user) for user in supervisors]
+    )
+    WorkerProfile.objects.bulk_create(
+        [WorkerProfile(user=user, full_name=user.full_name) for user in workers]
+    )
+    tasks = Task.objects.bulk_create(
+        [
+            Task(created_by=user, title=f"Load test task {index}", description="-")
+            for index, user in enumerate(supervisors)
+        ]
+    )
+    return [
+        (supervisor, worker, task.id)
+        for supervisor, worker, task in zip(supervisors, workers, tasks)
+    ]
+
+
+def cleanup():
+    last = FIRST_TELEGRAM_ID + 10_000_000
+    ids = {"telegram_id__gte": FIRST_TELEGRAM_ID, "telegram_id__lt": last}
+    ContactVerification.objects.filter(**ids).delete()
+    ConversationState.objects.filter(**ids).delete()
+    User.objects.filter(email__endswith="@loadtest.invalid").delete()
+
+
+def outcome(task_ids):
+    done = Task.objects.filter(
+        id__in=task_ids, status=Task.COMPLETED, rating__isnull=False
+    )
+    return done.count()
+
+
+class Command(BaseCommand):
+    help = "Load test the bot with scripted multi-step user flows"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pairs", type=int, default=1000)
+        parser.add_argument(
+            "--concurrency", type=int, default=100, help="Pairs active at once"
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0,
+            help="Simulated Telegram response time",
+        )
+        parser.add_argument("--timeout", type=float, default=60)
+        parser.add_argument("--keep-data", action="store_true")
+
+    def handle(self, *args, **options):
+        if options["pairs"] * 2 >= 10_000_000:
+            raise CommandError("--pairs is too large")
+
+        # Per-update request and handler logs would dominate the run
+        for name in ("httpx", "telegram_bot.bot", "telegram_bot.utils"):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        cleanup()
+        pairs = seed(options["pairs"])
+        self.stdout.write(f"Seeded {len(pairs)} supervisor/worker pairs")
+
+        try:
+            with FakeTelegramAPI(latency=options["latency_ms"] / 1000) as server:
+                with override_settings(TELEGRAM_API_BASE_URL=server.base_url):
+                    asyncio.run(self.run(server, pairs, options))
+                calls = dict(sorted(server.requests.items()))
+            completed = outcome([task_id for _, _, task_id in pairs])
+            self.stdout.write(f"Bot API calls: {calls}")
+        finally:
+            if not options["keep_data"]:
+                cleanup()
+
+        message = f"{completed}/{len(pairs)} flows completed and rated"
+        if completed < len(pairs):
+            raise CommandError(message)
+        self.stdout.write(self.style.SUCCESS(message))
+
+    async def run(self, server, pairs, options):
+        loop = asyncio.get_running_loop()
+        pending = {}
+        timings = defaultdict(list)
+        next_id = iter(range(1, 10**9))
+
+        def observe(update, waited, duration):
+            future = pending.pop(update.update_id, None)
+            if future and not future.done():
+                future.set_result(time.perf_counter())
+
+        async def step(name, build, *args):
+            update_id = next(next_id)
+            future = loop.create_future()
+            pending[update_id] = future
+            sent = time.perf_counter()
+            server.push_update(build(update_id, *args))
+            finished = await asyncio.wait_for(future, options["timeout"])
+            timings[name].append(finished - sent)
+
+        async def flow(supervisor, worker, task_id):
+            s, w = supervisor.telegram_id, worker.telegram_id
+            await step("share contact", contact_update, s, f"+2519{s}")
+            await step("share contact", contact_update, w, f"+2519{w}")
+            await step("/start", message_update, s, "/start")
+            await step("view workers", callback_update, s, "menu_view_workers")
+            await step("choose worker", callback_update, s, f"assign_task_{task_id}")
+            await step("assign", callback_update, s, f"assign_to_{task_id}_{worker.id}")
+            await step("available tasks", callback_update, w, "menu_available_tasks")
+            await step("open task", callback_update, w, f"task_{task_id}")
+            await step("start task", callback_update, w, f"start_task_{task_id}")
+            await step("submit task", callback_update, w, f"complete_task_{task_id}")
+            await step("complete task", callback_update, s, f"complete_task_{task_id}")
+            await step("rate", callback_update, s, f"rate_task_{task_id}_5")
+
+        limit = asyncio.Semaphore(options["concurrency"])
+
+        async def limited(pair):
+            async with limit:
+                await flow(*pair)
+
+        processor = ChatOrderedUpdateProcessor(observe=observe)
+        application = build_application(
+            TOKEN, base_url=server.base_url, processor=processor
+        )
+        queries_before = metrics.counters["db.queries"]
+        await application.initialize()
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+        await application.start()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(
+                *(limited(pair) for pair in pairs), return_exceptions=True
+            )
+            elapsed = time.perf_counter() - start
+        finally:
+            await application.updater.stop()
+            await application.stop()
+            await application.post_shutdown(application)
+            await application.shutdown()
+
+        failures = [result for result in results if isinstance(result, Exception)]
+        for error in failures[:5]:
+            self.stdout.write(self.style.WARNING(f"Flow failed: {error!r}"))
+
+        updates = sum(len(values) for values in timings.values())
+        queries = metrics.counters["db.queries"] - queries_before
+        self.stdout.write(
+            f"{updates} updates in {elapsed:.2f}s ({updates / elapsed:.0f}/s), "
+            f"{queries / max(updates, 1):.1f} DB queries per update, "
+            f"{len(failures)} flows failed"
+        )
+        width = max(len(name) for name in timings)
+        for name, values in timings.items():
+            self.stdout.write(
+                f"  {name:<{width}}  p50 {percentile(values, 0.5) * 1000:7.1f} ms"
+                f"  p95 {percentile(values, 0.95) * 1000:7.1f} ms"
+                f"  p99 {percentile(values, 0.99) * 1000:7.1f} ms"
+            )
+        all_values = [value for values in timings.values() for value in values]
+        self.stdout.write(
+            f"  {'all':<{width}}  p50 {percentile(all_values, 0.5) * 1000:7.1f} ms"
+            f"  p95 {percentile(all_values, 0.95) * 1000:7.1f} ms"
+            f"  p99 {percentile(all_values, 0.99) * 1000:7.1f} ms"
+        )
@@ -2,23 +2,12 @@
 Command to run the Telegram bot.
 """
 
-import logging
-import asyncio
 from django.core.management.base import BaseCommand
 from django.conf import settings
-from telegram import BotCommand, Update
-from telegram.ext import (
-    Application,
-    CommandHandler,
-    CallbackQueryHandler,
-    MessageHandler,
-    filters,
-    ContextTypes,
-)
+from telegram import Update
 
-from telegram_bot import bot as bot_module
-from telegram_bot.keyboards import *
-from telegram_bot.utils import *
+from telegram_bot.application import build_application
+from telegram_bot.contacts import verified_contacts
 
 
 class Command(BaseCommand):
@@ -34,30 +23,11 @@ class Command(BaseCommand):
             )
             return
 
-        application = Application.builder().token(token).build()
+        application = build_application(token)
 
-        application.add_handler(CommandHandler("start", bot_module.start))
-        application.add_handler(CommandHandler("help", bot_module.help_command))
-        application.add_handler(CommandHandler("profile", bot_module.profile))
-        application.add_handler(CommandHandler("cancel", bot_module.cancel))
-
-        # Set the bot commands
-        bot_commands = [
-            BotCommand(command="/start", description="Start the bot"),
-            BotCommand(command="/help", description="Show this help message"),
-        ]
-        application.bot.set_my_commands(bot_commands)
-
-        # Contact handler
-        application.add_handler(
-            MessageHandler(filters.CONTACT, bot_module.handle_contact)
-        )
-
-        application.add_handler(CallbackQueryHandler(bot_module.button_callback))
-
-        application.add_handler(
-            MessageHandler(filters.TEXT & ~filters.COMMAND, bot_module.handle_message)
-        )
+        # Load verified contacts so the contact gate needs no query per update
+        count = verified_contacts.warm()
+        self.stdout.write(f"Loaded {count} verified contacts")
 
         try:
             application.run_polling(
@@ -0,0 +1,69 @@
+"""
+Register the webhook URL with Telegram.
+
+Usage:
+    python manage.py setwebhook https://example.com/telegram/webhook/
+    python manage.py setwebhook --delete
+
+Telegram will send every update to the URL with the TELEGRAM_WEBHOOK_SECRET
+in the X-Telegram-Bot-Api-Secret-Token header. The secret may only contain
+letters, digits, "_" and "-". Deleting the webhook switches the bot back to
+polling with the runbot command.
+"""
+
+import asyncio
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from telegram import Bot, Update
+
+
+class Command(BaseCommand):
+    help = "Register or remove the Telegram webhook"
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", nargs="?", help="Public URL of the webhook")
+        parser.add_argument(
+            "--delete", action="store_true", help="Remove the webhook instead"
+        )
+        parser.add_argument(
+            "--drop-pending-updates",
+            action="store_true",
+            help="Discard updates Telegram queued while no one was listening",
+        )
+        parser.add_argument(
+            "--max-connections",
+            type=int,
+            default=40,
+            help="Concurrent connections Telegram may open to the webhook",
+        )
+
+    def handle(self, *args, **options):
+        if not options["delete"]:
+            if not options["url"]:
+                raise CommandError("Give the webhook URL or --delete")
+            if not getattr(settings, "TELEGRAM_WEBHOOK_SECRET", None):
+                raise CommandError("TELEGRAM_WEBHOOK_SECRET is not set")
+
+        asyncio.run(self.configure(options))
+
+    async def configure(self, options):
+        bot = Bot(
+            token=settings.TELEGRAM_BOT_TOKEN, base_url=settings.TELEGRAM_API_BASE_URL
+        )
+        async with bot:
+            if options["delete"]:
+                await bot.delete_webhook(
+                    drop_pending_updates=options["drop_pending_updates"]
+                )
+                self.stdout.write(self.style.SUCCESS("Webhook removed"))
+                return
+
+            await bot.set_webhook(
+                url=options["url"],
+                secret_token=settings.TELEGRAM_WEBHOOK_SECRET,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=options["max_connections"],
+                drop_pending_updates=options["drop_pending_updates"],
+            )
+        self.stdout.write(self.style.SUCCESS(f"Webhook set to {options['url']}"))
@@ -0,0 +1,168 @@
+"""
+Post synthetic Telegram updates to the webhook and time the bot's replies.
+
+Usage:
+    python manage.py webhook_harness
+    python manage.py webhook_harness --updates 500 --users 50 --concurrency 20
+    python manage.py webhook_harness --url http://localhost:8000/telegram/webhook/ --fake-port 8081
+
+By default the harness drives config.asgi in-process with the Bot API
+pointed at a local FakeTelegramAPI. With --url it posts to a running server
+instead, which must be started with TELEGRAM_API_BASE_URL set to
+http://127.0.0.1:<fake-port>/bot and the same TELEGRAM_WEBHOOK_SECRET.
+
+Each update is a /start message from one of --users synthetic users. The
+report shows how long the webhook took to answer (ack) and how long it took
+until the bot's reply reached the fake API (end to end). A request with a
+wrong secret is also sent and must be rejected with 403.
+"""
+
+import asyncio
+import secrets
+import statistics
+import time
+from collections import defaultdict, deque
+
+import httpx
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from telegram_bot import webhook as webhook_runner
+from telegram_bot.fake_api import FakeTelegramAPI, message_update
+from telegram_bot.views import SECRET_HEADER
+
+FIRST_USER_ID = 900_000_000
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Measure webhook acknowledgement and end-to-end reply latency"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--updates", type=int, default=200)
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument(
+            "--concurrency", type=int, default=10, help="Updates posted at once"
+        )
+        parser.add_argument(
+            "--latency-ms",
+            type=float,
+            default=0,
+            help="Simulated Telegram response time",
+        )
+        parser.add_argument("--url", help="Webhook URL of a running server")
+        parser.add_argument(
+            "--fake-port", type=int, default=0, help="Port for the fake Bot API"
+        )
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        secret = getattr(settings, "TELEGRAM_WEBHOOK_SECRET", None)
+        if options["url"] and not secret:
+            raise CommandError("TELEGRAM_WEBHOOK_SECRET must match the server's")
+        secret = secret or secrets.token_urlsafe(32)
+
+        replies = defaultdict(deque)
+        loop = asyncio.new_event_loop()
+
+        def on_send(params):
+            loop.call_soon_threadsafe(self.resolve, replies, params.get("chat_id"))
+
+        server = FakeTelegramAPI(
+            port=options["fake_port"],
+            latency=options["latency_ms"] / 1000,
+            on_send=on_send,
+        )
+        with server, override_settings(
+            TELEGRAM_API_BASE_URL=server.base_url, TELEGRAM_WEBHOOK_SECRET=secret
+        ):
+            try:
+                loop.run_until_complete(self.run(options, secret, replies))
+            finally:
+                loop.close()
+            self.stdout.write(f"Bot API calls: {dict(server.requests)}")
+
+    @staticmethod
+    def resolve(replies, chat_id):
+        if replies[chat_id]:
+            future = replies[chat_id].popleft()
+            if not future.done():
+                future.set_result(time.perf_counter())
+
+    async def run(self, options, secret, replies):
+        if options["url"]:
+            client = httpx.AsyncClient()
+            url = options["url"]
+        else:
+            from config.asgi import application
+
+            await webhook_runner.get_application()
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=application),
+                base_url="http://localhost",
+            )
+            url = "/telegram/webhook/"
+
+        try:
+            async with client:
+                rejected = await client.post(
+                    url,
+                    json=message_update(1, FIRST_USER_ID, "/start"),
+                    headers={SECRET_HEADER: "wrong"},
+                )
+                if rejected.status_code != 403:
+                    raise CommandError(
+                        f"Wrong secret answered {rejected.status_code}, expected 403"
+                    )
+                self.stdout.write("Wrong secret token rejected with 403")
+
+                await self.post_updates(client, url, secret, replies, options)
+        finally:
+            if not options["url"]:
+                await webhook_runner.stop_application()
+
+    async def post_updates(self, client, url, secret, replies, options):
+        loop = asyncio.get_running_loop()
+        limit = asyncio.Semaphore(options["concurrency"])
+        acks, latencies = [], []
+
+        async def post(index):
+            user_id = FIRST_USER_ID + index % options["users"]
+            update = message_update(index + 2, user_id, "/start")
+            reply = loop.create_future()
+            async with limit:
+                replies[user_id].append(reply)
+                sent = time.perf_counter()
+                response = await client.post(
+                    url, json=update, headers={SECRET_HEADER: secret}
+                )
+                acks.append(time.perf_counter() - sent)
+            response.raise_for_status()
+            received = await asyncio.wait_for(reply, options["timeout"])
+            latencies.append(received - sent)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(post(index) for index in range(options["updates"])))
+        elapsed = time.perf_counter() - start
+
+        self.report("Ack", acks)
+        self.report("End to end", latencies)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(latencies)} updates answered in {elapsed:.2f}s "
+                f"({len(latencies) / elapsed:.0f}/s)"
+            )
+        )
+
+    def report(self, label, values):
+        self.stdout.write(
+            f"{label}: p50 {percentile(values, 0.5) * 1000:.1f} ms, "
+            f"p95 {percentile(values, 0.95) * 1000:.1f} ms, "
+            f"max {max(values) * 1000:.1f} ms, "
+            f"mean {statistics.mean(values) * 1000:.1f} ms"
+        )
@@ -0,0 +1,187 @@
+"""
+In-process counters and latency histograms for the bot.
+
+Caches and handlers bump named counters with ``incr`` and record timings
+with ``observe``; both take optional labels, such as the handler name.
+``snapshot`` returns the counters, ``render_prometheus`` formats everything
+in the Prometheus text format for the ``/telegram/metrics/`` endpoint, and
+``log_periodically`` writes cache hit rates and handler latencies to the log
+while the bot runs.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+counters = Counter()
+# name -> {labels: Histogram}
+histograms = {}
+# Database helpers bump counters from their pool threads
+_lock = threading.Lock()
+
+# Cache names reported with a hit rate; each uses "<name>.hit" / "<name>.miss"
+CACHES = ["user_cache", "contact_cache", "page_cache"]
+
+# Upper bounds in seconds, and in queries for counts per update
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+PROMETHEUS_PREFIX = "telegram_bot_"
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # The last slot counts values above every bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = 0
+        while index < len(self.buckets) and value > self.buckets[index]:
+            index += 1
+        self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of values"""
+        if not self.count:
+            return None
+        target = math.ceil(self.count * fraction)
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return math.inf
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items()))) if labels else name
+
+
+def incr(name, amount=1, **labels):
+    with _lock:
+        counters[_key(name, labels)] += amount
+
+
+def observe(name, value, buckets=SECONDS_BUCKETS, **labels):
+    key = tuple(sorted(labels.items()))
+    with _lock:
+        series = histograms.setdefault(name, {})
+        if key not in series:
+            series[key] = Histogram(buckets)
+        series[key].observe(value)
+
+
+def snapshot():
+    return dict(counters)
+
+
+def hit_rate(name):
+    hits = counters[f"{name}.hit"]
+    total = hits + counters[f"{name}.miss"]
+    return hits / total if total else None
+
+
+def summary():
+    parts = []
+    for name in CACHES:
+        rate = hit_rate(name)
+        if rate is not None:
+            lookups = counters[f"{name}.hit"] + counters[f"{name}.miss"]
+            parts.append(f"{name} {rate:.0%} of {lookups}")
+    return ", ".join(parts) or "no lookups yet"
+
+
+def _format_bound(bound):
+    return "+Inf" if bound == math.inf else f"{bound:g}"
+
+
+def handler_summary():
+    """One line per handler and callback route: calls, errors, mean, p95"""
+    with _lock:
+        series = dict(histograms.get("handler.seconds", {}))
+    lines = []
+    for labels, histogram in sorted(series.items()):
+        label = ":".join(value for _, value in labels)
+        errors = counters[_key("handler.errors", dict(labels))]
+        mean = histogram.sum / histogram.count * 1000
+        p95 = _format_bound(histogram.quantile(0.95))
+        lines.append(
+            f"{label} {histogram.count} calls, {errors} errors, "
+            f"mean {mean:.0f} ms, p95 <= {p95} s"
+        )
+    return lines
+
+
+def _metric_name(name):
+    return PROMETHEUS_PREFIX + name.replace(".", "_")
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for key, value in pairs
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def render_prometheus():
+    """All counters and histograms in the Prometheus text exposition format"""
+    with _lock:
+        counter_items = list(counters.items())
+        histogram_items = {}
+        for name, series in histograms.items():
+            histogram_items[name] = [
+                (labels, h.buckets, list(h.counts), h.sum, h.count)
+                for labels, h in series.items()
+            ]
+
+    grouped = {}
+    for key, value in counter_items:
+        name, labels = key if isinstance(key, tuple) else (key, ())
+        grouped.setdefault(name, []).append((labels, value))
+
+    lines = []
+    for name, samples in sorted(grouped.items()):
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        for labels, value in sorted(samples):
+            lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    for name, series in sorted(histogram_items.items()):
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, buckets, counts, total, count in sorted(
+            series, key=lambda item: item[0]
+        ):
+            cumulative = 0
+            for bound, bucket_count in zip(buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = _format_labels(labels, le=_format_bound(bound))
+                lines.append(f"{metric}_bucket{le} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+def log_summary():
+    logger.info(f"Bot cache hit rates: {summary()}")
+    for line in handler_summary():
+        logger.info(f"Bot handler {line}")
+
+
+async def log_periodically(interval=300):
+    while True:
+        await asyncio.sleep(interval)
+        log_summary()
@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class ConversationState(models.Model):
@@ -8,6 +9,8 @@ class ConversationState(models.Model):
     current_state = models.CharField(max_length=100, blank=True, null=True)
     context_data = models.JSONField(default=dict, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # time.time_ns() of the change this row holds; older writes are skipped
+    version = models.BigIntegerField(default=0)
 
     class Meta:
         db_table = "conversation_states"
@@ -36,3 +39,40 @@ class ContactVerification(models.Model):
 
     def __str__(self):
         return f"{self.telegram_id}: {self.phone_number}"
+
+
+class NotificationOutbox(models.Model):
+    """Telegram messages waiting to be delivered by the outbox dispatcher"""
+
+    PENDING = "PENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    telegram_id = models.BigIntegerField()
+    kind = models.CharField(max_length=50)
+    message = models.TextField()
+    parse_mode = models.CharField(max_length=20, blank=True, null=True)
+    reply_markup = models.JSONField(blank=True, null=True)
+    dedupe_key = models.CharField(max_length=255, unique=True, blank=True, null=True)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "notification_outbox"
+        indexes = [
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} to {self.telegram_id} ({self.status})"
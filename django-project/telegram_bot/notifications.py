@@ -1,9 +1,15 @@
 """
 Telegram notification utilities for sending messages to users
+
+Each notification has a ``build_*`` function that renders the message and
+keyboard, and an async ``notify_*`` helper that sends it right away. API views
+queue notifications through ``telegram_bot.outbox`` instead, which renders
+them with the same builders.
 """
 
-from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
-from django.conf import settings
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+
+from telegram_bot.notifier import get_notifier
 
 import logging
 
@@ -16,9 +22,7 @@ async def send_telegram_notification(
     """Send a notification message to a user via Telegram"""
 
     try:
-        bot = Bot(token=settings.TELEGRAM_BOT_TOKEN)
-
-        await bot.send_message(
+        await get_notifier().send_message(
             chat_id=telegram_id,
             text=message,
             parse_mode=parse_mode,
@@ -33,11 +37,7 @@ async def send_telegram_notification(
         return False
 
 
-async def notify_task_assigned(
-    worker_telegram_id: int, task_title: str, supervisor_name: str, task_id: int
-):
-    """Notify a worker that they have been assigned a new task"""
-
+def build_task_assigned(task_title: str, supervisor_name: str, task_id: int):
     message = f"""
 🎯 <b>New Task Assigned!</b>
 
@@ -56,23 +56,62 @@ What would you like to do?
     ]
     reply_markup = InlineKeyboardMarkup(keyboard)
 
+    return {"message": message, "parse_mode": "HTML", "reply_markup": reply_markup}
+
+
+async def notify_task_assigned(
+    worker_telegram_id: int, task_title: str, supervisor_name: str, task_id: int
+):
+    """Notify a worker that they have been assigned a new task"""
+
     return await send_telegram_notification(
         telegram_id=worker_telegram_id,
-        message=message,
-        parse_mode="HTML",
-        reply_markup=reply_markup,
+        **build_task_assigned(task_title, supervisor_name, task_id),
     )
 
 
-async def notify_task_status_updated(
-    supervisor_telegram_id: int,
-    task_title: str,
-    worker_name: str,
-    new_status: str,
-    task_id: int = None,
+def build_tasks_assigned(tasks: list, supervisor_name: str):
+    if len(tasks) == 1:
+        task_id, task_title = tasks[0]
+        return build_task_assigned(task_title, supervisor_name, task_id)
+
+    task_lines = "\n".join(f"• #{task_id}: {title}" for task_id, title in tasks)
+    message = f"""
+🎯 <b>{len(tasks)} New Tasks Assigned!</b>
+
+<b>Assigned by:</b> {supervisor_name}
+
+{task_lines}
+"""
+
+    # Telegram caps inline keyboards, so only link the first few tasks
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                f"📋 #{task_id}: {title[:30]}", callback_data=f"task_{task_id}"
+            )
+        ]
+        for task_id, title in tasks[:10]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
+
+    return {"message": message, "parse_mode": "HTML", "reply_markup": reply_markup}
+
+
+async def notify_tasks_assigned(
+    worker_telegram_id: int, tasks: list, supervisor_name: str
 ):
-    """Notify a supervisor that a task status has been updated"""
+    """Notify a worker about several new tasks in a single message"""
 
+    return await send_telegram_notification(
+        telegram_id=worker_telegram_id,
+        **build_tasks_assigned(tasks, supervisor_name),
+    )
+
+
+def build_task_status_updated(
+    task_title: str, worker_name: str, new_status: str, task_id: int = None
+):
     status_emoji = {
         "IN_PROGRESS": "🔄",
         "SUBMITTED": "✅",
@@ -126,19 +165,44 @@ async def notify_task_status_updated(
 
     reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
 
+    return {"message": message, "parse_mode": "HTML", "reply_markup": reply_markup}
+
+
+async def notify_task_status_updated(
+    supervisor_telegram_id: int,
+    task_title: str,
+    worker_name: str,
+    new_status: str,
+    task_id: int = None,
+):
+    """Notify a supervisor that a task status has been updated"""
+
     return await send_telegram_notification(
         telegram_id=supervisor_telegram_id,
-        message=message,
-        parse_mode="HTML",
-        reply_markup=reply_markup,
+        **build_task_status_updated(task_title, worker_name, new_status, task_id),
     )
 
 
-async def notify_task_completed(
-    worker_telegram_id: int, task_title: str, rating: float = None, comment: str = None
-):
-    """Notify a worker that their task has been marked as completed"""
+def build_task_claimed(task_title: str, worker_name: str, task_id: int = None):
+    message = f"""
+🙋 <b>Task Claimed</b>
+
+<b>Task:</b> {task_title}
+<b>Worker:</b> {worker_name}
+"""
 
+    keyboard = []
+    if task_id:
+        keyboard.append(
+            [InlineKeyboardButton("📋 View Details", callback_data=f"task_{task_id}")]
+        )
+
+    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
+
+    return {"message": message, "parse_mode": "HTML", "reply_markup": reply_markup}
+
+
+def build_task_completed(task_title: str, rating: float = None, comment: str = None):
     message = f"""
 🎉 <b>Task Completed!</b>
 
@@ -151,7 +215,110 @@ async def notify_task_completed(
     if comment:
         message += f'\n\n💬 <b>Supervisor Feedback:</b>\n<i>"{comment}"</i>'
 
-    print("notification: ", message)
+    return {"message": message, "parse_mode": "HTML"}
+
+
+async def notify_task_completed(
+    worker_telegram_id: int, task_title: str, rating: float = None, comment: str = None
+):
+    """Notify a worker that their task has been marked as completed"""
+
+    content = build_task_completed(task_title, rating, comment)
+    return await send_telegram_notification(telegram_id=worker_telegram_id, **content)
+
+
+def build_deadline_reminder(task_title: str, task_id: int, deadline, threshold: str):
+    if threshold == "overdue":
+        header = "⏰ <b>Task Overdue!</b>"
+    else:
+        header = f"⏳ <b>Task Due in {threshold}</b>"
+
+    message = f"""
+{header}
+
+<b>Task:</b> {task_title}
+<b>Deadline:</b> {deadline.strftime("%Y-%m-%d %H:%M")} UTC
+"""
+
+    keyboard = [
+        [InlineKeyboardButton("📋 View Details", callback_data=f"task_{task_id}")]
+    ]
+
+    return {
+        "message": message,
+        "parse_mode": "HTML",
+        "reply_markup": InlineKeyboardMarkup(keyboard),
+    }
+
+
+async def notify_deadline_reminder(
+    telegram_id: int, task_title: str, task_id: int, deadline, threshold: str
+):
+    """Remind a user that a task deadline is approaching or has passed"""
+
     return await send_telegram_notification(
-        telegram_id=worker_telegram_id, message=message, parse_mode="HTML"
+        telegram_id=telegram_id,
+        **build_deadline_reminder(task_title, task_id, deadline, threshold),
     )
+
+
+# Telegram rejects messages over 4096 characters
+DIGEST_MAX_LENGTH = 4000
+DIGEST_MAX_BUTTON_ROWS = 20
+
+
+def build_digest(messages: list, keyboards: list):
+    """
+    Combine several queued messages for one chat into a single message.
+
+    ``keyboards`` holds the inline keyboard rows of each message, or None.
+    Messages are taken in order while the text fits ``DIGEST_MAX_LENGTH`` and
+    the merged buttons fit ``DIGEST_MAX_BUTTON_ROWS``. ``included`` in the
+    result is how many were taken (at least one); the caller sends the rest
+    separately.
+    """
+
+    # Reserve room for the longest header this digest could get
+    length = len(f"📬 <b>{len(messages)} Updates</b>")
+    parts = []
+    rows = []
+    seen = set()
+    for text, keyboard in zip(messages, keyboards):
+        text = text.strip()
+
+        # Merge the keyboards, dropping rows that point at the same callbacks
+        new_rows = {}
+        for row in keyboard or ():
+            key = tuple(button.callback_data for button in row)
+            if key not in seen:
+                new_rows.setdefault(key, list(row))
+
+        if parts and (
+            length + len(text) + 2 > DIGEST_MAX_LENGTH
+            or len(rows) + len(new_rows) > DIGEST_MAX_BUTTON_ROWS
+        ):
+            break
+        parts.append(text)
+        length += len(text) + 2
+        seen.update(new_rows)
+        rows += new_rows.values()
+
+    rows = rows[:DIGEST_MAX_BUTTON_ROWS]
+
+    header = f"📬 <b>{len(parts)} Updates</b>"
+    return {
+        "message": "\n\n".join([header] + parts),
+        "parse_mode": "HTML",
+        "reply_markup": InlineKeyboardMarkup(rows) if rows else None,
+        "included": len(parts),
+    }
+
+
+BUILDERS = {
+    "task_assigned": build_task_assigned,
+    "tasks_assigned": build_tasks_assigned,
+    "task_status_updated": build_task_status_updated,
+    "task_claimed": build_task_claimed,
+    "task_completed": build_task_completed,
+    "deadline_reminder": build_deadline_reminder,
+}
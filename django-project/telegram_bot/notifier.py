@@ -0,0 +1,128 @@
+"""
+Long-lived Telegram client for outgoing notifications.
+
+Notifications are sent from sync views through ``async_to_sync``, which runs
+every call on a fresh event loop, so an HTTP client created inside the call
+can never be reused. The notifier instead owns one ``Bot`` with a pooled
+HTTPX client running on a dedicated event loop thread; callers on any loop
+or thread hand their requests over to it and keep-alive connections are
+shared by every ``notify_*`` helper in the process.
+"""
+
+import asyncio
+import atexit
+import logging
+import os
+import threading
+
+from django.conf import settings
+from telegram import Bot
+
+from telegram_bot.instrumentation import InstrumentedRequest
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramNotifier:
+    def __init__(
+        self,
+        token,
+        base_url=None,
+        pool_size=8,
+        connect_timeout=5.0,
+        read_timeout=10.0,
+    ):
+        self.token = token
+        self.base_url = base_url or "https://api.telegram.org/bot"
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._bot = None
+
+    @property
+    def bot(self):
+        self.start()
+        return self._bot
+
+    def start(self):
+        """Start the event loop thread and HTTP client on first use"""
+        if self._loop is not None:
+            return
+        with self._lock:
+            if self._loop is not None:
+                return
+            request = InstrumentedRequest(
+                connection_pool_size=self.pool_size,
+                connect_timeout=self.connect_timeout,
+                read_timeout=self.read_timeout,
+                write_timeout=self.read_timeout,
+                pool_timeout=self.connect_timeout,
+            )
+            self._bot = Bot(token=self.token, base_url=self.base_url, request=request)
+
+            loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=loop.run_forever, name="telegram-notifier", daemon=True
+            )
+            self._thread.start()
+            self._loop = loop
+
+    def submit(self, coro):
+        """Schedule ``coro`` on the notifier loop, returning a concurrent Future"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def call(self, method, **kwargs):
+        """Await ``Bot.<method>(**kwargs)`` from any event loop"""
+        future = self.submit(getattr(self.bot, method)(**kwargs))
+        return await asyncio.wrap_future(future)
+
+    async def send_message(self, **kwargs):
+        return await self.call("send_message", **kwargs)
+
+    def close(self, timeout=5):
+        with self._lock:
+            if self._loop is None:
+                return
+            loop, bot = self._loop, self._bot
+            self._loop = self._bot = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(bot.shutdown(), loop).result(timeout)
+        except Exception as e:
+            logger.warning(f"Telegram notifier did not shut down cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        loop.close()
+
+
+_notifier = None
+_notifier_pid = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier():
+    """The process-wide notifier, created lazily (and again after a fork)"""
+    global _notifier, _notifier_pid
+    if _notifier is None or _notifier_pid != os.getpid():
+        with _notifier_lock:
+            if _notifier is None or _notifier_pid != os.getpid():
+                _notifier = TelegramNotifier(
+                    token=settings.TELEGRAM_BOT_TOKEN,
+                    base_url=settings.TELEGRAM_API_BASE_URL,
+                    pool_size=settings.TELEGRAM_NOTIFY_POOL_SIZE,
+                    connect_timeout=settings.TELEGRAM_NOTIFY_CONNECT_TIMEOUT,
+                    read_timeout=settings.TELEGRAM_NOTIFY_READ_TIMEOUT,
+                )
+                _notifier_pid = os.getpid()
+    return _notifier
+
+
+@atexit.register
+def _close_notifier():
+    if _notifier is not None and _notifier_pid == os.getpid():
+        _notifier.close()
@@ -0,0 +1,324 @@
+"""
+Transactional outbox for Telegram notifications.
+
+API views call ``enqueue`` inside the transaction that changes the task, so a
+notification is stored if and only if the change commits, and the request
+itself never talks to Telegram. The ``dispatch_notifications`` command drains
+the table with ``OutboxDispatcher``:
+
+- rows are claimed with a short lease (``SELECT ... FOR UPDATE SKIP LOCKED``
+  where the database supports it), so a crashed dispatcher's rows are picked
+  up again once the lease runs out;
+- sends are paced by a global rate and a minimum interval per chat, following
+  Telegram's broadcast limits, and ``RetryAfter`` answers pause the chat;
+- transient failures are retried with exponential backoff, while blocked bots
+  and bad chat ids fail permanently;
+- an optional ``dedupe_key`` makes enqueueing the same notification twice a
+  no-op.
+
+Notifications that are not urgent are held for ``NOTIFICATION_DIGEST_WINDOW``
+seconds (default 60, 0 disables). When the first of them for a chat comes
+due, every held notification for that chat is sent as one digest message, so
+a busy supervisor gets one summary instead of a message per status change.
+Kinds listed in ``NOTIFICATION_URGENT_KINDS`` always go out on their own.
+"""
+
+import asyncio
+import logging
+import math
+import random
+import time
+from collections import Counter
+from concurrent.futures import as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from telegram import InlineKeyboardMarkup
+from telegram.error import BadRequest, ChatMigrated, Forbidden, RetryAfter
+
+from telegram_bot.models import NotificationOutbox
+from telegram_bot.notifications import BUILDERS, build_digest
+from telegram_bot.notifier import get_notifier
+
+logger = logging.getLogger(__name__)
+
+PERMANENT_ERRORS = (Forbidden, BadRequest, ChatMigrated)
+
+DEFAULT_URGENT_KINDS = {"task_assigned", "tasks_assigned", "deadline_reminder"}
+
+
+def get_digest_window():
+    return timedelta(seconds=getattr(settings, "NOTIFICATION_DIGEST_WINDOW", 60))
+
+
+def get_urgent_kinds():
+    return set(getattr(settings, "NOTIFICATION_URGENT_KINDS", DEFAULT_URGENT_KINDS))
+
+
+def enqueue(kind, telegram_id, dedupe_key=None, **kwargs):
+    """Queue a notification rendered by the ``build_<kind>`` builder"""
+    if not telegram_id:
+        return
+
+    content = BUILDERS[kind](**kwargs)
+    reply_markup = content.get("reply_markup")
+    send_at = timezone.now()
+    if kind not in get_urgent_kinds():
+        send_at += get_digest_window()
+    NotificationOutbox.objects.bulk_create(
+        [
+            NotificationOutbox(
+                telegram_id=telegram_id,
+                kind=kind,
+                message=content["message"],
+                parse_mode=content.get("parse_mode"),
+                reply_markup=reply_markup.to_dict() if reply_markup else None,
+                dedupe_key=dedupe_key,
+                next_attempt_at=send_at,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def seconds(value):
+    # PTB reports RetryAfter.retry_after as int or timedelta depending on version
+    return value.total_seconds() if isinstance(value, timedelta) else float(value)
+
+
+class RateLimiter:
+    """
+    Spaces sends by a global rate and a minimum interval per chat.
+
+    The global limit is kept as a count of reserved sends per one-second
+    window, so a message held back by its chat's interval does not delay
+    messages to other chats.
+    """
+
+    def __init__(self, global_rate=25, per_chat_interval=1.0):
+        self.global_rate = global_rate
+        self.per_chat_interval = per_chat_interval
+        self.windows = Counter()
+        self.next_chat = {}
+
+    def slot(self, chat_id, clock):
+        """Earliest time a message to ``chat_id`` may go out"""
+        allowed = max(clock, self.next_chat.get(chat_id, 0.0))
+        while self.windows[math.floor(allowed)] >= self.global_rate:
+            allowed = math.floor(allowed) + 1.0
+        return allowed
+
+    def delay(self, chat_id, clock):
+        return self.slot(chat_id, clock) - clock
+
+    def reserve(self, chat_id, clock):
+        """Book the next free slot for ``chat_id`` and return its delay"""
+        allowed = self.slot(chat_id, clock)
+        self.windows[math.floor(allowed)] += 1
+        self.next_chat[chat_id] = allowed + self.per_chat_interval
+
+        for window in [w for w in self.windows if w < math.floor(clock)]:
+            del self.windows[window]
+        return allowed - clock
+
+    def pause(self, chat_id, clock, duration):
+        self.next_chat[chat_id] = max(
+            self.next_chat.get(chat_id, 0.0), clock + duration
+        )
+
+
+class OutboxDispatcher:
+    def __init__(
+        self,
+        notifier=None,
+        batch_size=100,
+        global_rate=25,
+        per_chat_interval=1.0,
+        max_delay=5.0,
+        lease=timedelta(seconds=60),
+        max_attempts=8,
+        max_backoff=timedelta(hours=1),
+    ):
+        self.notifier = notifier or get_notifier()
+        self.batch_size = batch_size
+        self.limiter = RateLimiter(global_rate, per_chat_interval)
+        self.max_delay = max_delay
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+
+    def claim(self, now):
+        """
+        Lease a batch of due rows to this dispatcher.
+
+        Chats with a due digestible row also get their other held digestible
+        rows, so they can be merged into one message. Only rows that were
+        never attempted are pulled in early; rows waiting out a retry
+        backoff keep their ``next_attempt_at``.
+        """
+        urgent = get_urgent_kinds()
+        with transaction.atomic():
+            rows = list(
+                NotificationOutbox.objects.select_for_update(skip_locked=True)
+                .filter(status=NotificationOutbox.PENDING, next_attempt_at__lte=now)
+                .order_by("next_attempt_at", "id")[: self.batch_size]
+            )
+            digest_chats = {row.telegram_id for row in rows if row.kind not in urgent}
+            if digest_chats:
+                rows += list(
+                    NotificationOutbox.objects.select_for_update(skip_locked=True)
+                    .filter(
+                        status=NotificationOutbox.PENDING,
+                        telegram_id__in=digest_chats,
+                        next_attempt_at__gt=now,
+                        attempts=0,
+                    )
+                    .exclude(kind__in=urgent)
+                    .order_by("id")
+                )
+            if rows:
+                NotificationOutbox.objects.filter(
+                    id__in=[row.id for row in rows]
+                ).update(next_attempt_at=now + self.lease)
+        return rows
+
+    def deliveries(self, rows):
+        """
+        Group claimed rows into messages: urgent rows and lone digestible
+        rows are sent as they are, the rest are merged per chat. Each message
+        is returned with exactly the rows it carries, so only those are
+        marked sent.
+        """
+        urgent = get_urgent_kinds()
+        held = {}
+        deliveries = []
+        for row in rows:
+            if row.kind in urgent or not row.parse_mode:
+                deliveries.append((row.telegram_id, [row]))
+            else:
+                held.setdefault(row.telegram_id, []).append(row)
+        deliveries += list(held.items())
+        deliveries.sort(key=lambda delivery: min(row.id for row in delivery[1]))
+
+        messages = []
+        for telegram_id, group in deliveries:
+            # A digest holds as many rows as fit; the rest go in further
+            # messages to the same chat, spaced by the rate limiter
+            while group:
+                if len(group) == 1:
+                    row = group[0]
+                    content = {
+                        "message": row.message,
+                        "parse_mode": row.parse_mode,
+                        "reply_markup": self.markup(row.reply_markup),
+                    }
+                    messages.append((telegram_id, group, content))
+                    break
+
+                content = build_digest(
+                    [row.message for row in group],
+                    [
+                        (
+                            self.markup(row.reply_markup).inline_keyboard
+                            if row.reply_markup
+                            else None
+                        )
+                        for row in group
+                    ],
+                )
+                included = content.pop("included")
+                messages.append((telegram_id, group[:included], content))
+                group = group[included:]
+        return messages
+
+    @staticmethod
+    def markup(data):
+        return InlineKeyboardMarkup.de_json(data, None) if data else None
+
+    async def send(self, telegram_id, content, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        return await self.notifier.bot.send_message(
+            chat_id=telegram_id,
+            text=content["message"],
+            parse_mode=content["parse_mode"] or None,
+            reply_markup=content["reply_markup"],
+        )
+
+    def run_once(self):
+        """Send one batch; returns the number of rows claimed"""
+        now = timezone.now()
+        rows = self.claim(now)
+        if not rows:
+            return 0
+
+        clock = time.monotonic()
+        futures = {}
+        for telegram_id, group, content in self.deliveries(rows):
+            wait = self.limiter.delay(telegram_id, clock)
+            if wait > self.max_delay:
+                # The chat is busy well past this batch; hand the rows back
+                for row in group:
+                    self.reschedule(row, now + timedelta(seconds=wait))
+                continue
+            wait = self.limiter.reserve(telegram_id, clock)
+            futures[self.notifier.submit(self.send(telegram_id, content, wait))] = group
+
+        for future in as_completed(futures):
+            for row in futures[future]:
+                self.record(row, future.exception())
+
+        return len(rows)
+
+    def record(self, row, error):
+        now = timezone.now()
+        outbox = NotificationOutbox.objects.filter(pk=row.pk)
+
+        if error is None:
+            outbox.update(
+                status=NotificationOutbox.SENT,
+                attempts=row.attempts + 1,
+                sent_at=now,
+                last_error="",
+            )
+            return
+
+        if isinstance(error, RetryAfter):
+            retry_after = seconds(error.retry_after)
+            self.limiter.pause(row.telegram_id, time.monotonic(), retry_after)
+            self.reschedule(row, now + timedelta(seconds=retry_after), str(error))
+            return
+
+        attempts = row.attempts + 1
+        if isinstance(error, PERMANENT_ERRORS) or attempts >= self.max_attempts:
+            logger.warning(
+                f"Giving up on {row.kind} notification {row.pk} "
+                f"to {row.telegram_id}: {error}"
+            )
+            outbox.update(
+                status=NotificationOutbox.FAILED,
+                attempts=attempts,
+                last_error=str(error),
+            )
+            return
+
+        backoff = min(timedelta(seconds=2**attempts), self.max_backoff)
+        backoff *= random.uniform(1, 1.5)
+        outbox.update(
+            attempts=attempts, next_attempt_at=now + backoff, last_error=str(error)
+        )
+
+    def reschedule(self, row, when, error=None):
+        changes = {"next_attempt_at": when}
+        if error:
+            changes["last_error"] = error
+        NotificationOutbox.objects.filter(pk=row.pk).update(**changes)
+
+    def purge(self, older_than):
+        """Delete delivered rows sent before ``older_than``"""
+        deleted, _ = NotificationOutbox.objects.filter(
+            status=NotificationOutbox.SENT, sent_at__lt=older_than
+        ).delete()
+        return deleted
@@ -0,0 +1,112 @@
+"""
+Keyset pagination for the bot's inline keyboard lists.
+
+Lists of tasks and workers are shown ``TELEGRAM_PAGE_SIZE`` rows at a time
+(default 8). Pages are fetched with ``WHERE id < cursor ORDER BY id DESC
+LIMIT n + 1`` (or the reverse for ascending lists), so every screen is one
+small indexed query however long the list is. The cursor travels in the
+navigation buttons' ``callback_data`` as ``pg:<list>:<arg>:<n|p>:<cursor>``,
+which stays well within Telegram's 64-byte limit.
+
+Pages are kept in ``page_cache`` for ``TELEGRAM_PAGE_CACHE_TTL`` seconds
+(default 10), so flicking back and forth doesn't query again. Bot actions
+that change tasks clear it; changes made through the API show up when the
+entries expire.
+"""
+
+import uuid
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+from core.cache import LocalLRU
+from telegram_bot import metrics
+
+PREFIX = "pg"
+
+
+def get_page_size():
+    return getattr(settings, "TELEGRAM_PAGE_SIZE", 8)
+
+
+def encode_cursor(value):
+    return value.hex if isinstance(value, uuid.UUID) else str(value)
+
+
+def page_callback(name, arg, direction, cursor):
+    return f"{PREFIX}:{name}:{arg}:{direction}:{cursor}"
+
+
+def parse_page_callback(data):
+    """(list name, argument, backward, cursor) from a navigation button"""
+    _, name, arg, direction, cursor = data.split(":", 4)
+    return name, arg, direction == "p", cursor or None
+
+
+def keyset_page(queryset, cursor=None, backward=False, descending=False, size=None):
+    """
+    One page of ``queryset`` rows (dicts with an ``id``) after ``cursor``,
+    or before it when ``backward`` is set.
+
+    Returns ``{"items": [...], "prev": cursor or None, "next": cursor or None}``.
+    """
+    size = size or get_page_size()
+    # Walking backward through a descending list is ascending, and so on
+    ascending = descending == backward
+    queryset = queryset.order_by("id" if ascending else "-id")
+    if cursor:
+        lookup = "id__gt" if ascending else "id__lt"
+        try:
+            queryset = queryset.filter(**{lookup: cursor})
+        except (ValidationError, ValueError):
+            # A tampered or outdated cursor; start from the beginning
+            return keyset_page(queryset, descending=descending, size=size)
+
+    rows = list(queryset[: size + 1])
+    more = len(rows) > size
+    rows = rows[:size]
+    if backward:
+        rows.reverse()
+
+    first = encode_cursor(rows[0]["id"]) if rows else None
+    last = encode_cursor(rows[-1]["id"]) if rows else None
+    if backward:
+        has_prev, has_next = more, True
+    else:
+        has_prev, has_next = cursor is not None, more
+
+    return {
+        "items": rows,
+        "prev": first if has_prev and rows else None,
+        "next": last if has_next and rows else None,
+    }
+
+
+class PageCache:
+    def __init__(self, ttl=None, max_entries=1000):
+        self.ttl = ttl or getattr(settings, "TELEGRAM_PAGE_CACHE_TTL", 10)
+        # Locked: handlers read it on the event loop while bot actions clear
+        # it from the database pool threads
+        self._entries = LocalLRU(max_entries)
+
+    def get(self, key):
+        return self._entries.get(key, None)
+
+    def set(self, key, page):
+        self._entries.set(key, page, self.ttl)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def get_or_load(self, key, load, *args, **kwargs):
+        page = self.get(key)
+        if page is not None:
+            metrics.incr("page_cache.hit")
+            return page
+        metrics.incr("page_cache.miss")
+        page = await load(*args, **kwargs)
+        self.set(key, page)
+        return page
+
+
+page_cache = PageCache()
@@ -0,0 +1,106 @@
+"""
+Concurrent update processing that keeps each chat's updates in order.
+
+python-telegram-bot handles one update at a time by default, so a handler
+waiting on the database holds up every other user. ``ChatOrderedUpdateProcessor``
+runs updates from different chats side by side, while updates from the same
+chat still run one after another in the order they arrived, which the
+multi-step conversation flows rely on.
+
+Three limits keep a slow database from snowballing:
+
+- at most ``TELEGRAM_MAX_CONCURRENT_UPDATES`` handlers run at once (default 32);
+- at most ``TELEGRAM_MAX_PENDING_UPDATES`` updates are admitted, running or
+  waiting for their turn (default 1000). Further updates wait inside
+  python-telegram-bot, and the webhook answers 503 so Telegram retries later;
+- an update that waited longer than ``TELEGRAM_UPDATE_MAX_WAIT`` seconds for
+  its turn (default 60, 0 disables) is dropped instead of run, as the user has
+  most likely moved on or retried by then.
+"""
+
+import asyncio
+import logging
+import time
+
+from django.conf import settings
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+from telegram_bot import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def chat_key(update):
+    """Updates with the same key are processed in order"""
+    if isinstance(update, Update):
+        if update.effective_chat:
+            return update.effective_chat.id
+        if update.effective_user:
+            return update.effective_user.id
+    return None
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_running=None, max_pending=None, max_wait=None, observe=None):
+        if max_running is None:
+            max_running = getattr(settings, "TELEGRAM_MAX_CONCURRENT_UPDATES", 32)
+        if max_pending is None:
+            max_pending = getattr(settings, "TELEGRAM_MAX_PENDING_UPDATES", 1000)
+        if max_wait is None:
+            max_wait = getattr(settings, "TELEGRAM_UPDATE_MAX_WAIT", 60)
+
+        # The base class semaphore bounds admitted updates; it wakes waiters
+        # in arrival order, so updates enter do_process_update in queue order
+        super().__init__(max(max_pending, max_running))
+        self.max_running = max_running
+        self.max_wait = max_wait
+        # Called with (update, seconds waited, seconds running) after each update
+        self.observe = observe
+        self._running = None
+        # chat key -> future resolved when the chat's latest update finishes
+        self._tails = {}
+
+    @property
+    def overloaded(self):
+        return self.current_concurrent_updates >= self.max_concurrent_updates
+
+    async def initialize(self):
+        self._running = asyncio.Semaphore(self.max_running)
+        self._tails = {}
+
+    async def shutdown(self):
+        pass
+
+    async def do_process_update(self, update, coroutine):
+        key = chat_key(update)
+        previous = self._tails.get(key) if key is not None else None
+        done = asyncio.get_running_loop().create_future()
+        if key is not None:
+            self._tails[key] = done
+
+        admitted = time.monotonic()
+        try:
+            if previous is not None:
+                await previous
+            async with self._running:
+                started = time.monotonic()
+                waited = started - admitted
+                if self.max_wait and waited > self.max_wait:
+                    coroutine.close()
+                    metrics.incr("updates.shed")
+                    logger.warning(
+                        f"Dropped update {getattr(update, 'update_id', '?')} "
+                        f"after waiting {waited:.1f}s"
+                    )
+                    return
+                try:
+                    await coroutine
+                finally:
+                    metrics.incr("updates.processed")
+                    if self.observe:
+                        self.observe(update, waited, time.monotonic() - started)
+        finally:
+            done.set_result(None)
+            if key is not None and self._tails.get(key) is done:
+                del self._tails[key]
@@ -0,0 +1,35 @@
+"""
+Keep the bot's user cache in step with changes made outside the bot.
+
+The workers API, the CPASS registration and link views and the admin all
+save ``CustomUser`` and profile rows without going through the bot, so the
+cached copies are dropped whenever one of those rows is saved or deleted.
+The receivers run in the process that made the change: in webhook mode that
+is the bot's own process, while a separate ``runbot`` process still relies
+on ``TELEGRAM_USER_CACHE_TTL`` for changes made elsewhere.
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from telegram_bot.user_cache import invalidate
+from work_management.models import SupervisorProfile
+from workers.users_models import CustomUser, WorkerProfile
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def user_changed(sender, instance, **kwargs):
+    # By user id as well, so the entry under a previous telegram_id goes too
+    transaction.on_commit(
+        lambda: invalidate(telegram_ids=[instance.telegram_id], user_ids=[instance.pk])
+    )
+
+
+@receiver(post_save, sender=WorkerProfile)
+@receiver(post_delete, sender=WorkerProfile)
+@receiver(post_save, sender=SupervisorProfile)
+@receiver(post_delete, sender=SupervisorProfile)
+def profile_changed(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate(user_ids=[instance.user_id]))
@@ -0,0 +1,226 @@
+"""
+Conversation state storage for multi-step bot flows.
+
+Reads and writes go to a fast store instead of the conversation_states
+table:
+
+- ``memory`` keeps states in a dict, for a single bot process;
+- ``cache`` keeps them in Django's default cache, for several bot processes
+  sharing a cache backend.
+
+Pick one with the ``TELEGRAM_STATE_STORE`` setting. Both drop states idle
+for ``TELEGRAM_STATE_IDLE_TIMEOUT`` seconds (default 86400). Every change is
+also handed to a ``StateWriter``, which writes the changes to
+``ConversationState`` in batches every ``TELEGRAM_STATE_FLUSH_INTERVAL``
+seconds, and once more on shutdown. A state missing from the fast store, for
+example after a restart, is loaded from the table, so flows survive restarts.
+
+Each change is stamped with the time it was made, and a row is only
+overwritten by a newer change. Cleared states are kept as empty rows
+carrying that stamp, so a process flushing late can't bring back a state
+another process has since changed or cleared.
+"""
+
+import asyncio
+import copy
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from telegram_bot.db import database_sync_to_async
+from telegram_bot.models import ConversationState
+
+logger = logging.getLogger(__name__)
+
+EMPTY = {"state": None, "data": {}}
+
+
+def load_state(telegram_id):
+    try:
+        state = ConversationState.objects.get(telegram_id=telegram_id)
+    except ConversationState.DoesNotExist:
+        return None
+    if state.current_state is None and not state.context_data:
+        # Cleared
+        return None
+    return {"state": state.current_state, "data": state.context_data}
+
+
+def write_states(changes):
+    """
+    Apply {telegram_id: (state or None, version)} to the table in one
+    transaction, skipping rows that already hold a newer version
+    """
+    now = timezone.now()
+    rows = {
+        telegram_id: ConversationState(
+            telegram_id=telegram_id,
+            current_state=value["state"] if value else None,
+            context_data=value["data"] if value else {},
+            version=version,
+        )
+        for telegram_id, (value, version) in changes.items()
+    }
+    with transaction.atomic():
+        ConversationState.objects.bulk_create(rows.values(), ignore_conflicts=True)
+        for telegram_id, row in rows.items():
+            ConversationState.objects.filter(
+                telegram_id=telegram_id, version__lt=row.version
+            ).update(
+                current_state=row.current_state,
+                context_data=row.context_data,
+                version=row.version,
+                updated_at=now,
+            )
+
+
+class StateWriter:
+    """Write-behind buffer that persists state changes in batches"""
+
+    def __init__(self, interval=2.0, max_pending=500):
+        self.interval = interval
+        self.max_pending = max_pending
+        self.pending = {}
+        self._task = None
+        self._wake = None
+
+    def record(self, telegram_id, value):
+        self.pending[telegram_id] = (value, time.time_ns())
+        self.start()
+        if len(self.pending) >= self.max_pending:
+            self._wake.set()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        changes, self.pending = self.pending, {}
+        if not changes:
+            return
+        try:
+            await database_sync_to_async(write_states)(changes)
+        except Exception as e:
+            logger.error(f"Failed to persist {len(changes)} conversation states: {e}")
+            # Keep the failed batch unless a newer change replaced it
+            self.pending = {**changes, **self.pending}
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+class BaseStateStore(ABC):
+    def __init__(self, writer):
+        self.writer = writer
+
+    @abstractmethod
+    async def lookup(self, telegram_id):
+        """Cached state, None for a known empty state, or ... if unknown"""
+
+    @abstractmethod
+    async def remember(self, telegram_id, value):
+        """Cache ``value`` (None for an empty state) for ``telegram_id``"""
+
+    async def get(self, telegram_id):
+        # The fast store comes first: with a shared cache it may hold a newer
+        # change from another process than this process's unflushed one
+        value = await self.lookup(telegram_id)
+        if value is ...:
+            if telegram_id in self.writer.pending:
+                value = self.writer.pending[telegram_id][0]
+            else:
+                value = await database_sync_to_async(load_state)(telegram_id)
+            await self.remember(telegram_id, value)
+        # Handlers mutate the returned data before saving it back
+        return copy.deepcopy(value or EMPTY)
+
+    async def set(self, telegram_id, state, data=None):
+        value = {"state": state, "data": data or {}}
+        await self.remember(telegram_id, value)
+        self.writer.record(telegram_id, value)
+
+    async def clear(self, telegram_id):
+        await self.remember(telegram_id, None)
+        self.writer.record(telegram_id, None)
+
+
+class MemoryStateStore(BaseStateStore):
+    def __init__(self, writer, timeout=86400):
+        super().__init__(writer)
+        self.timeout = timeout
+        # telegram_id -> (monotonic expiry, state), least recently used first
+        self.states = OrderedDict()
+
+    async def lookup(self, telegram_id):
+        entry = self.states.get(telegram_id)
+        if entry is None or entry[0] <= time.monotonic():
+            return ...
+        self.states[telegram_id] = (time.monotonic() + self.timeout, entry[1])
+        self.states.move_to_end(telegram_id)
+        return entry[1]
+
+    async def remember(self, telegram_id, value):
+        now = time.monotonic()
+        self.states[telegram_id] = (now + self.timeout, copy.deepcopy(value))
+        self.states.move_to_end(telegram_id)
+        # Every access moves its entry to the end, so idle ones are in front
+        while self.states:
+            oldest = next(iter(self.states))
+            if self.states[oldest][0] > now:
+                break
+            del self.states[oldest]
+
+
+class CacheStateStore(BaseStateStore):
+    def __init__(self, writer, timeout=86400):
+        super().__init__(writer)
+        self.timeout = timeout
+
+    @staticmethod
+    def key(telegram_id):
+        return f"conversation-state:{telegram_id}"
+
+    async def lookup(self, telegram_id):
+        value = await cache.aget(self.key(telegram_id), ...)
+        return None if value == "" else value
+
+    async def remember(self, telegram_id, value):
+        # The cache can't store None distinctly from a miss
+        await cache.aset(self.key(telegram_id), value or "", self.timeout)
+
+
+STORES = {
+    "memory": MemoryStateStore,
+    "cache": CacheStateStore,
+}
+
+_store = None
+
+
+def get_state_store():
+    global _store
+    if _store is None:
+        backend = getattr(settings, "TELEGRAM_STATE_STORE", "memory")
+        interval = getattr(settings, "TELEGRAM_STATE_FLUSH_INTERVAL", 2.0)
+        timeout = getattr(settings, "TELEGRAM_STATE_IDLE_TIMEOUT", 86400)
+        _store = STORES[backend](StateWriter(interval=interval), timeout=timeout)
+    return _store
@@ -0,0 +1,11 @@
+"""
+URL routes for the Telegram bot webhook and metrics.
+"""
+
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("webhook/", views.webhook, name="telegram_webhook"),
+    path("metrics/", views.metrics_view, name="telegram_metrics"),
+]
@@ -0,0 +1,71 @@
+"""
+Caching for ``get_user_by_telegram_id``.
+
+Serialized users are kept in a process-wide LRU of up to
+``TELEGRAM_USER_CACHE_MAX_ENTRIES`` users (default 10000) and expire after
+``TELEGRAM_USER_CACHE_TTL`` seconds (default 30).
+
+Code that changes a user's profile, ratings or counters calls ``invalidate``
+so the bot doesn't show stale numbers, and saving a user or profile row
+anywhere in the process does the same (see ``telegram_bot.signals``).
+Changes made by other processes are picked up when the entry expires.
+Unknown users are never cached, so a user who just registered through the
+mini app is seen straight away.
+"""
+
+from django.conf import settings
+
+from core.cache import MISSING, LocalLRU
+from telegram_bot import metrics
+
+
+class UserCache:
+    def __init__(self, ttl=None, max_entries=None):
+        self.ttl = ttl or getattr(settings, "TELEGRAM_USER_CACHE_TTL", 30)
+        max_entries = max_entries or getattr(
+            settings, "TELEGRAM_USER_CACHE_MAX_ENTRIES", 10000
+        )
+        # telegram_id -> serialized user
+        self._entries = LocalLRU(max_entries)
+        # user id -> telegram_id, for invalidation by user id
+        self._telegram_ids = LocalLRU(max_entries)
+
+    def get(self, telegram_id):
+        user = self._entries.get(telegram_id)
+        return None if user is MISSING else user
+
+    def set(self, telegram_id, user):
+        self._entries.set(telegram_id, user, self.ttl)
+        self._telegram_ids.set(user["id"], telegram_id, self.ttl)
+
+    def invalidate(self, telegram_ids=(), user_ids=()):
+        telegram_ids = set(telegram_ids)
+        for user_id in user_ids:
+            telegram_id = self._telegram_ids.get(str(user_id))
+            if telegram_id is not MISSING:
+                self._telegram_ids.delete(str(user_id))
+                telegram_ids.add(telegram_id)
+
+        for telegram_id in telegram_ids:
+            self._entries.delete(telegram_id)
+
+
+user_cache = UserCache()
+
+
+def invalidate(telegram_ids=(), user_ids=()):
+    user_cache.invalidate(telegram_ids, user_ids)
+
+
+async def get_cached_user(telegram_id, load):
+    """Return the serialized user, calling ``await load(telegram_id)`` on a miss"""
+    user = user_cache.get(telegram_id)
+    if user is not None:
+        metrics.incr("user_cache.hit")
+        return user
+
+    metrics.incr("user_cache.miss")
+    user = await load(telegram_id)
+    if user is not None:
+        user_cache.set(telegram_id, user)
+    return user
@@ -2,18 +2,28 @@
 Utility functions for Telegram bot operations
 """
 
-from typing import Optional, Dict, List
-from asgiref.sync import sync_to_async
+from typing import Optional, Dict
 from workers.users_models import CustomUser as User, WorkerProfile
-from telegram_bot.models import ConversationState
+from telegram_bot.db import database_sync_to_async
+from telegram_bot.paging import keyset_page, page_cache
+from telegram_bot.state_store import get_state_store
+from telegram_bot.user_cache import get_cached_user, invalidate as invalidate_users
 from work_management.models import Task, TaskProgress, Rating, Role
+from work_management.counters import CounterUpdates
+from work_management import summary, transitions
 
 from django.utils import timezone
 
 
-@sync_to_async
-def get_user_by_telegram_id(telegram_id: int) -> Optional[Dict]:
-    """Fetch user data by telegram ID"""
+async def get_user_by_telegram_id(telegram_id: int) -> Optional[Dict]:
+    """Fetch user data by telegram ID, cached briefly"""
+
+    return await get_cached_user(telegram_id, load_user_by_telegram_id)
+
+
+@database_sync_to_async
+def load_user_by_telegram_id(telegram_id: int) -> Optional[Dict]:
+    """Fetch user data by telegram ID from the database"""
     try:
         user = User.objects.select_related("worker_profile", "supervisor_profile").get(
             telegram_id=telegram_id
@@ -60,7 +70,7 @@ def serialize_user(user: User) -> Dict:
     return data
 
 
-@sync_to_async
+@database_sync_to_async
 def register_user(data: Dict) -> Optional[Dict]:
     """Register a new user"""
 
@@ -94,38 +104,30 @@ def register_user(data: Dict) -> Optional[Dict]:
                     bio=bio,
                 )
 
+        invalidate_users(telegram_ids=[user.telegram_id])
+        page_cache.clear()
         return serialize_user(user)
     except Exception as e:
         print(f"Error registering user: {e}")
         return None
 
 
-@sync_to_async
-def get_conversation_state(telegram_id: int) -> Dict:
-    """Get conversation state from database"""
+async def get_conversation_state(telegram_id: int) -> Dict:
+    """Get conversation state"""
 
-    try:
-        state = ConversationState.objects.get(telegram_id=telegram_id)
-        return {"state": state.current_state, "data": state.context_data}
-    except ConversationState.DoesNotExist:
-        return {"state": None, "data": {}}
+    return await get_state_store().get(telegram_id)
 
 
-@sync_to_async
-def set_conversation_state(telegram_id: int, state: str, data: Dict = None):
+async def set_conversation_state(telegram_id: int, state: str, data: Dict = None):
     """Set conversation state"""
 
-    ConversationState.objects.update_or_create(
-        telegram_id=telegram_id,
-        defaults={"current_state": state, "context_data": data or {}},
-    )
+    await get_state_store().set(telegram_id, state, data)
 
 
-@sync_to_async
-def clear_conversation_state(telegram_id: int):
+async def clear_conversation_state(telegram_id: int):
     """Clear conversation state"""
 
-    ConversationState.objects.filter(telegram_id=telegram_id).delete()
+    await get_state_store().clear(telegram_id)
 
 
 def serialize_task(task: Task) -> Dict:
@@ -146,6 +148,10 @@ def serialize_task(task: Task) -> Dict:
         "created_at": task.created_at.isoformat(),
         "assigned_at": task.assigned_at.isoformat() if task.assigned_at else None,
         "completed_at": task.completed_at.isoformat() if task.completed_at else None,
+        "latest_progress_percentage": task.latest_progress_percentage,
+        "latest_progress_at": (
+            task.latest_progress_at.isoformat() if task.latest_progress_at else None
+        ),
     }
 
     if hasattr(task, "rating"):
@@ -159,50 +165,45 @@ def serialize_task(task: Task) -> Dict:
     return data
 
 
-@sync_to_async
-def get_available_tasks() -> List[Dict]:
-    """Get all available (open) tasks"""
+@database_sync_to_async
+def load_task_page(cursor=None, backward=False, **filters) -> Dict:
+    """One page of tasks matching ``filters``, newest first"""
 
-    tasks = Task.objects.filter(status=Task.OPEN).select_related("created_by")
-    return [serialize_task(task) for task in tasks]
+    tasks = Task.objects.filter(**filters).values("id", "title", "status")
+    return keyset_page(tasks, cursor, backward, descending=True)
 
 
-@sync_to_async
-def get_tasks_by_worker(worker_id: str) -> List[Dict]:
-    """Get tasks assigned to a worker"""
+async def get_task_page(cursor=None, backward=False, **filters) -> Dict:
+    """A page of tasks for a list keyboard, cached briefly"""
 
-    tasks = Task.objects.filter(assigned_to_id=worker_id).select_related(
-        "created_by", "assigned_to"
+    key = ("tasks", tuple(sorted(filters.items())), cursor, backward)
+    return await page_cache.get_or_load(
+        key, load_task_page, cursor, backward, **filters
     )
-    return [serialize_task(task) for task in tasks]
 
 
-@sync_to_async
-def get_tasks_by_supervisor(supervisor_id: str) -> List[Dict]:
-    """Get tasks created by a supervisor"""
+@database_sync_to_async
+def get_task_summary(user_id: str, role: str) -> Dict:
+    """Get status counts, rating stats and recent tasks for a user"""
 
-    tasks = Task.objects.filter(created_by_id=supervisor_id).select_related(
-        "created_by", "assigned_to"
-    )
-    return [serialize_task(task) for task in tasks]
+    # Bot users carry upper-case roles, the summary uses Role constants
+    return summary.get_summary(user_id, role.lower())
 
 
-@sync_to_async
+@database_sync_to_async
 def get_task_detail(task_id: int) -> Optional[Dict]:
     """Get detailed information about a task"""
 
     try:
-        task = (
-            Task.objects.select_related("created_by", "assigned_to")
-            .prefetch_related("progress_updates")
-            .get(id=task_id)
+        task = Task.objects.select_related("created_by", "assigned_to", "category").get(
+            id=task_id
         )
         return serialize_task(task)
     except Task.DoesNotExist:
         return None
 
 
-@sync_to_async
+@database_sync_to_async
 def create_task(data: Dict) -> Optional[Dict]:
     """Create a new task"""
 
@@ -216,18 +217,20 @@ def create_task(data: Dict) -> Optional[Dict]:
             location=data.get("location", ""),
         )
 
-        if hasattr(task.created_by, "supervisor_profile"):
-            supervisor_profile = task.created_by.supervisor_profile
-            supervisor_profile.total_tasks_created += 1
-            supervisor_profile.save()
+        transitions.log_created(task)
+
+        with CounterUpdates() as counters:
+            counters.task_created(task.created_by_id)
 
+        invalidate_users(user_ids=[task.created_by_id])
+        page_cache.clear()
         return serialize_task(task)
     except Exception as e:
         print(f"Error creating task: {e}")
         return None
 
 
-@sync_to_async
+@database_sync_to_async
 def assign_task(task_id: int, worker_id: str) -> Optional[Dict]:
     """Assign a task to a worker"""
 
@@ -235,61 +238,43 @@ def assign_task(task_id: int, worker_id: str) -> Optional[Dict]:
         task = Task.objects.select_related("created_by").get(id=task_id)
         worker = User.objects.get(id=worker_id, user_type="worker")
 
-        if task.status != Task.OPEN:
+        if not transitions.assign(task, worker):
             return None
 
-        task.assigned_to = worker
-        task.status = Task.ASSIGNED
-        task.assigned_at = timezone.now()
-        task.save()
-
-        if hasattr(worker, "worker_profile"):
-            worker.worker_profile.total_tasks_assigned += 1
-            worker.worker_profile.save()
-
-        if hasattr(task.created_by, "supervisor_profile"):
-            supervisor_profile = task.created_by.supervisor_profile
-            if (
-                supervisor_profile.total_workers_supervised == 0
-                or not Task.objects.filter(
-                    created_by=task.created_by, assigned_to=worker
-                )
-                .exclude(id=task_id)
-                .exists()
-            ):
-                supervisor_profile.total_workers_supervised += 1
-                supervisor_profile.save()
-
+        invalidate_users(user_ids=[worker.id, task.created_by_id])
+        page_cache.clear()
         return serialize_task(task)
     except (Task.DoesNotExist, User.DoesNotExist) as e:
         print(f"Error assigning task: {e}")
         return None
 
 
-@sync_to_async
+@database_sync_to_async
 def update_task_status(
     task_id: int, status: str, unassign: bool = False
 ) -> Optional[Dict]:
     """Update task status and optionally unassign worker"""
 
     try:
-        task = Task.objects.get(id=task_id)
-        task.status = status
-
-        if status == Task.COMPLETED:
-            task.completed_at = timezone.now()
+        task = Task.objects.select_related("created_by", "assigned_to").get(id=task_id)
+        assignee_id = task.assigned_to_id
 
         if unassign and status == Task.OPEN:
-            task.assigned_to = None
-            task.assigned_at = None
+            changed = transitions.unassign(task)
+        else:
+            changed = transitions.transition(task, status)
+
+        if not changed:
+            return None
 
-        task.save()
+        invalidate_users(user_ids=[assignee_id, task.created_by_id])
+        page_cache.clear()
         return serialize_task(task)
     except Task.DoesNotExist:
         return None
 
 
-@sync_to_async
+@database_sync_to_async
 def add_task_progress(
     task_id: int, user_id: str, status_update: str, progress_percentage: int
 ) -> Optional[Dict]:
@@ -307,8 +292,8 @@ def add_task_progress(
         )
 
         if task.status == Task.ASSIGNED:
-            task.status = Task.IN_PROGRESS
-            task.save()
+            transitions.transition(task, Task.IN_PROGRESS)
+            page_cache.clear()
 
         return {
             "id": progress.id,
@@ -320,7 +305,7 @@ def add_task_progress(
         return None
 
 
-@sync_to_async
+@database_sync_to_async
 def rate_task(
     task_id: int, supervisor_id: str, score: int, comment: str = ""
 ) -> Optional[Dict]:
@@ -349,6 +334,7 @@ def rate_task(
         )
 
         logger.info(f"Successfully created rating {rating.id} for task {task_id}")
+        invalidate_users(user_ids=[task.assigned_to_id])
 
         return {"id": rating.id, "score": rating.score, "comment": rating.comment}
     except (Task.DoesNotExist, User.DoesNotExist) as e:
@@ -359,12 +345,34 @@ def rate_task(
         return None
 
 
-@sync_to_async
-def get_all_workers() -> List[Dict]:
-    """Get all registered workers"""
+@database_sync_to_async
+def load_worker_page(cursor=None, backward=False) -> Dict:
+    """One page of workers, with just what the list keyboards show"""
+
+    workers = User.objects.filter(user_type="worker").values(
+        "id", "full_name", "worker_profile__reputation_score"
+    )
+    page = keyset_page(workers, cursor, backward)
+    page["items"] = [
+        {
+            "id": str(worker["id"]),
+            "full_name": worker["full_name"],
+            "worker_profile": {
+                "reputation_score": float(
+                    worker["worker_profile__reputation_score"] or 0
+                )
+            },
+        }
+        for worker in page["items"]
+    ]
+    return page
+
+
+async def get_worker_page(cursor=None, backward=False) -> Dict:
+    """A page of workers for a list keyboard, cached briefly"""
 
-    workers = User.objects.filter(user_type="worker").select_related("worker_profile")
-    return [serialize_user(worker) for worker in workers]
+    key = ("workers", cursor, backward)
+    return await page_cache.get_or_load(key, load_worker_page, cursor, backward)
 
 
 def format_task_detail(task: Dict) -> str:
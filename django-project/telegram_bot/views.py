@@ -0,0 +1,86 @@
+"""
+Webhook endpoint receiving updates from Telegram, and the bot's metrics.
+"""
+
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from telegram import Update
+
+from telegram_bot import metrics
+from telegram_bot import webhook as webhook_runner
+
+logger = logging.getLogger(__name__)
+
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+@csrf_exempt
+@require_POST
+async def webhook(request):
+    """
+    Queue an update posted by Telegram for the bot application.
+
+    Telegram sends the secret given to ``setWebhook`` in a header on every
+    call; requests without it are rejected. The update is only queued here,
+    so Telegram gets its answer without waiting for the handlers.
+    """
+
+    secret = getattr(settings, "TELEGRAM_WEBHOOK_SECRET", None)
+    if not secret:
+        return JsonResponse({"error": "Webhook not configured"}, status=404)
+
+    token = request.headers.get(SECRET_HEADER, "")
+    if not hmac.compare_digest(token.encode(), secret.encode()):
+        return JsonResponse({"error": "Invalid secret token"}, status=403)
+
+    try:
+        data = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+
+    application = await webhook_runner.get_application()
+    if application.update_processor.overloaded:
+        # Telegram redelivers the update later
+        response = JsonResponse({"error": "Bot is busy"}, status=503)
+        response["Retry-After"] = "5"
+        return response
+
+    try:
+        update = Update.de_json(data, application.bot)
+    except Exception as e:
+        logger.warning(f"Rejected malformed update: {e}")
+        return JsonResponse({"error": "Invalid update"}, status=400)
+
+    await application.update_queue.put(update)
+    return JsonResponse({"ok": True})
+
+
+@require_GET
+def metrics_view(request):
+    """
+    Bot metrics of this process in the Prometheus text format.
+
+    Scrapers authenticate with ``Authorization: Bearer <TELEGRAM_METRICS_TOKEN>``;
+    without that setting the endpoint is disabled. In polling mode the bot
+    runs in the ``runbot`` process, which logs its metrics instead, so this
+    only covers notifications sent from the web process.
+    """
+
+    token = getattr(settings, "TELEGRAM_METRICS_TOKEN", None)
+    if not token:
+        return JsonResponse({"error": "Metrics not configured"}, status=404)
+
+    expected = f"Bearer {token}"
+    given = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(given.encode(), expected.encode()):
+        return JsonResponse({"error": "Invalid token"}, status=403)
+
+    return HttpResponse(
+        metrics.render_prometheus(), content_type="text/plain; version=0.0.4"
+    )
@@ -0,0 +1,73 @@
+"""
+Runs the bot inside the ASGI server when Telegram delivers updates by webhook.
+
+The application is built on first use in the server's event loop and is
+started without an updater: ``views.webhook`` puts each posted update on
+``application.update_queue`` and answers straight away, while the
+application's own task processes the queue in the background. ``lifespan``
+handles the ASGI lifespan protocol so the bot is started with the server and
+flushes its state when the server shuts down.
+"""
+
+import asyncio
+import logging
+
+from asgiref.sync import sync_to_async
+
+from telegram_bot.application import build_application
+from telegram_bot.contacts import verified_contacts
+
+logger = logging.getLogger(__name__)
+
+_application = None
+_lock = None
+
+
+async def get_application():
+    """The running bot application, started on first call"""
+    global _application, _lock
+    if _application is not None:
+        return _application
+
+    if _lock is None:
+        _lock = asyncio.Lock()
+    async with _lock:
+        if _application is None:
+            application = build_application(updater=False)
+            await sync_to_async(verified_contacts.warm)()
+            await application.initialize()
+            # post_init only runs automatically under run_polling/run_webhook
+            await application.post_init(application)
+            await application.start()
+            _application = application
+            logger.info("Telegram webhook application started")
+    return _application
+
+
+async def stop_application():
+    global _application
+    if _application is None:
+        return
+    application, _application = _application, None
+    await application.stop()
+    await application.post_shutdown(application)
+    await application.shutdown()
+    logger.info("Telegram webhook application stopped")
+
+
+async def lifespan(scope, receive, send):
+    """ASGI lifespan handler starting and stopping the bot with the server"""
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                await get_application()
+            except Exception as e:
+                logger.exception("Failed to start the Telegram application")
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await stop_application()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -3,6 +3,34 @@ const API = {
   BASE_URL: window.location.origin + "/api",
   CPASS_URL: CPASS_URL || "http://localhost:8080",
 
+  // Mini app session: { token, expiresAt }
+  session: null,
+
+  // Authorization header for endpoints that act for the Telegram user.
+  // The session comes from validating Telegram's initData and is renewed
+  // shortly before it expires.
+  async sessionHeaders() {
+    if (!this.session || Date.now() >= this.session.expiresAt) {
+      const response = await fetch(`${this.BASE_URL}/telegram/validate-webapp/`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ init_data: window.Telegram?.WebApp?.initData }),
+      });
+
+      if (!response.ok) {
+        throw new Error("Failed to start mini app session");
+      }
+
+      const data = await response.json();
+      this.session = {
+        token: data.session_token,
+        expiresAt: Date.now() + (data.session_expires_in - 30) * 1000,
+      };
+    }
+
+    return { Authorization: `MiniApp ${this.session.token}` };
+  },
+
   // Generate auth token for CPASS integration
   async generateAuthToken(telegramId, phoneNumber) {
     const response = await fetch(`${this.BASE_URL}/telegram/generate-token/`, {
@@ -24,7 +52,9 @@ const API = {
 
   // User endpoints
   async getUser(telegramId) {
-    const response = await fetch(`${this.BASE_URL}/cpass/user/${telegramId}/`);
+    const response = await fetch(`${this.BASE_URL}/cpass/user/${telegramId}/`, {
+      headers: await this.sessionHeaders(),
+    });
     return await response.json();
   },
 
@@ -0,0 +1,103 @@
+"""
+Task lifecycle analytics computed from the TaskEvent log.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import Case, F, When, Window
+from django.db.models.functions import Lead
+from django.utils import timezone
+
+from .models import TaskEvent
+
+DEFAULT_PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile, matching SQL PERCENTILE_CONT"""
+    if not sorted_values:
+        return None
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    spread = sorted_values[upper] - sorted_values[lower]
+    return sorted_values[lower] + spread * (rank - lower)
+
+
+def time_in_state(
+    since=None,
+    until=None,
+    category_id=None,
+    supervisor_id=None,
+    percentiles=DEFAULT_PERCENTILES,
+):
+    """
+    Time spent in each status, grouped by category, supervisor and status.
+
+    Each event is paired with the task's next event through a LEAD() window
+    over (task, ts), so durations come out of a single query served by the
+    (task, ts) index. States a task has not left yet are not counted.
+    """
+    until = until or timezone.now()
+    since = since or until - timedelta(days=30)
+
+    events = TaskEvent.objects.filter(ts__gte=since)
+    if category_id:
+        events = events.filter(category_id=category_id)
+    if supervisor_id:
+        events = events.filter(supervisor_id=supervisor_id)
+
+    rows = (
+        events.annotate(
+            left_at=Window(
+                expression=Lead("ts"),
+                partition_by=[F("task_id")],
+                order_by=F("ts").asc(),
+            ),
+        )
+        # Refers to the window, so Django filters on it in an outer query and
+        # LEAD() above still sees events after ``until``. States a task
+        # hasn't left yet (no next event) are dropped here too.
+        .annotate(left_state_at=Case(When(left_at__isnull=False, then=F("ts"))))
+        .filter(left_state_at__lt=until)
+        .values_list(
+            "category_id",
+            "category__name",
+            "supervisor_id",
+            "supervisor__full_name",
+            "to_status",
+            "ts",
+            "left_at",
+        )
+    )
+
+    durations = defaultdict(list)
+    for *key, ts, left_at in rows.iterator():
+        durations[tuple(key)].append((left_at - ts).total_seconds())
+
+    results = []
+    for key in sorted(durations, key=str):
+        category, category_name, supervisor, supervisor_name, state = key
+        values = sorted(durations[key])
+        results.append(
+            {
+                "category": category,
+                "category_name": category_name,
+                "supervisor": str(supervisor),
+                "supervisor_name": supervisor_name,
+                "status": state,
+                "count": len(values),
+                "mean_seconds": round(sum(values) / len(values), 2),
+                **{
+                    f"p{pct}_seconds": round(percentile(values, pct), 2)
+                    for pct in percentiles
+                },
+            }
+        )
+
+    return {
+        "since": since.isoformat(),
+        "until": until.isoformat(),
+        "results": results,
+    }
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class WorkManagementConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'work_management'
+
+    def ready(self):
+        from work_management import signals  # noqa: F401
@@ -0,0 +1,76 @@
+"""
+Atomic counter updates for worker and supervisor profiles.
+
+Task workflows bump denormalized counters (tasks assigned, completed, created,
+workers supervised). Instead of loading the profile, incrementing in Python
+and saving every column, increments are collected for the duration of a
+request and applied as ``UPDATE ... SET x = x + n`` statements; rows that
+receive the same increments share a single statement.
+"""
+
+from collections import defaultdict
+
+from django.db.models import F
+from django.utils import timezone
+
+from workers.users_models import WorkerProfile
+from .models import SupervisorProfile
+
+
+class CounterUpdates:
+    """
+    Collect counter increments and apply them in as few UPDATEs as possible.
+
+    Usable as a context manager; pending increments are applied on a clean exit:
+
+        with CounterUpdates() as counters:
+            counters.task_assigned(worker.id)
+            counters.worker_supervised(task.created_by_id)
+    """
+
+    def __init__(self):
+        # (model, user_id) -> {field: delta}
+        self._pending = defaultdict(lambda: defaultdict(int))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.apply()
+        else:
+            self._pending.clear()
+        return False
+
+    def add(self, model, user_id, field, amount=1):
+        if user_id is None or not amount:
+            return
+        self._pending[(model, user_id)][field] += amount
+
+    def task_assigned(self, worker_id, amount=1):
+        self.add(WorkerProfile, worker_id, "total_tasks_assigned", amount)
+
+    def task_completed(self, worker_id, amount=1):
+        self.add(WorkerProfile, worker_id, "total_tasks_completed", amount)
+
+    def task_created(self, supervisor_id, amount=1):
+        self.add(SupervisorProfile, supervisor_id, "total_tasks_created", amount)
+
+    def worker_supervised(self, supervisor_id, amount=1):
+        self.add(SupervisorProfile, supervisor_id, "total_workers_supervised", amount)
+
+    def apply(self):
+        """Write pending increments, one UPDATE per distinct set of deltas"""
+        grouped = defaultdict(list)
+        for (model, user_id), deltas in self._pending.items():
+            changes = tuple(sorted((f, d) for f, d in deltas.items() if d))
+            if changes:
+                grouped[(model, changes)].append(user_id)
+
+        now = timezone.now()
+        for (model, changes), user_ids in grouped.items():
+            model.objects.filter(user_id__in=user_ids).update(
+                **{field: F(field) + delta for field, delta in changes},
+                updated_at=now,
+            )
+        self._pending.clear()
@@ -0,0 +1,197 @@
+"""
+Deadline reminders for assigned tasks.
+
+The scheduler keeps an in-memory heap of upcoming reminder times and only
+reads the tasks table to extend its horizon. Each read is a keyset-paginated
+range scan over the (status, deadline) index limited to active tasks whose
+deadline falls inside the new window, so the cost does not grow with the
+number of historical tasks. Sent reminders are recorded in TaskReminder,
+which guarantees at most one reminder per task and threshold even across
+restarts or several sweeper processes.
+"""
+
+import heapq
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task, TaskReminder
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = [Task.ASSIGNED, Task.IN_PROGRESS]
+
+# threshold name -> how long before the deadline the reminder goes out
+DEFAULT_THRESHOLDS = {
+    "24h": timedelta(hours=24),
+    "1h": timedelta(hours=1),
+    "overdue": timedelta(0),
+}
+
+
+def get_thresholds():
+    configured = getattr(settings, "TASK_DEADLINE_REMINDERS", None)
+    if not configured:
+        return DEFAULT_THRESHOLDS
+    return {name: timedelta(seconds=seconds) for name, seconds in configured.items()}
+
+
+class DeadlineScheduler:
+    """
+    Heap-based reminder scheduler.
+
+    ``notify`` is called as ``notify(task, threshold)`` for every reminder
+    that is due and has not been sent yet.
+    """
+
+    def __init__(
+        self,
+        notify,
+        thresholds=None,
+        batch_size=500,
+        lookahead=timedelta(minutes=30),
+        overdue_grace=timedelta(days=1),
+        rescan_interval=timedelta(minutes=10),
+    ):
+        self.notify = notify
+        self.thresholds = thresholds or get_thresholds()
+        self.batch_size = batch_size
+        self.lookahead = lookahead
+        self.overdue_grace = overdue_grace
+        self.rescan_interval = rescan_interval
+
+        self.heap = []
+        self.scheduled = set()
+        self.horizon = None
+        self.last_rescan = None
+
+    def refill(self, now):
+        """Extend the heap up to now + longest threshold + lookahead"""
+        if self.last_rescan is None or now - self.last_rescan >= self.rescan_interval:
+            # Periodically rescan the whole active window to pick up deadlines
+            # that were moved to an earlier time after being scheduled.
+            self.horizon = None
+            self.last_rescan = now
+
+        start = self.horizon or now - self.overdue_grace
+        end = now + max(self.thresholds.values()) + self.lookahead
+        if end > start:
+            self.load(start, end, now)
+            self.horizon = end
+
+    def load(self, start, end, now):
+        """Push reminders for active tasks with start < deadline <= end"""
+        tasks = (
+            Task.objects.filter(
+                status__in=ACTIVE_STATUSES, deadline__gt=start, deadline__lte=end
+            )
+            .order_by("deadline", "id")
+            .values_list("id", "deadline")
+        )
+
+        loaded = 0
+        cursor = None
+        while True:
+            page = tasks
+            if cursor:
+                deadline, task_id = cursor
+                page = page.filter(
+                    Q(deadline__gt=deadline) | Q(deadline=deadline, id__gt=task_id)
+                )
+            rows = list(page[: self.batch_size])
+            for task_id, deadline in rows:
+                self.schedule(task_id, deadline, now)
+            loaded += len(rows)
+            if len(rows) < self.batch_size:
+                break
+            last_id, last_deadline = rows[-1]
+            cursor = (last_deadline, last_id)
+
+        return loaded
+
+    def schedule(self, task_id, deadline, now):
+        fire_times = sorted(
+            ((deadline - offset, name) for name, offset in self.thresholds.items()),
+            reverse=True,
+        )
+        # Of the reminders that are already due, only the most recent one is
+        # still useful; a task loaded after its deadline only gets "overdue".
+        already_due = [entry for entry in fire_times if entry[0] <= now][:1]
+        upcoming = [entry for entry in fire_times if entry[0] > now]
+
+        for fire_at, name in already_due + upcoming:
+            key = (task_id, name, deadline)
+            if key not in self.scheduled:
+                self.scheduled.add(key)
+                heapq.heappush(self.heap, (fire_at, task_id, name, deadline))
+
+    def pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, task_id, name, deadline = heapq.heappop(self.heap)
+            self.scheduled.discard((task_id, name, deadline))
+            due.append((task_id, name, deadline))
+        return due
+
+    def fire(self, due):
+        """Send due reminders that are still relevant and not yet sent"""
+        if not due:
+            return 0
+
+        task_ids = {task_id for task_id, _, _ in due}
+        tasks = Task.objects.filter(
+            id__in=task_ids, status__in=ACTIVE_STATUSES
+        ).select_related("created_by", "assigned_to")
+        tasks = {task.id: task for task in tasks}
+        already_sent = set(
+            TaskReminder.objects.filter(task_id__in=task_ids).values_list(
+                "task_id", "threshold"
+            )
+        )
+
+        to_send = []
+        for task_id, name, deadline in due:
+            task = tasks.get(task_id)
+            # Skip finished tasks and entries whose deadline has since changed
+            if task is None or task.deadline != deadline:
+                continue
+            if (task_id, name) in already_sent:
+                continue
+            already_sent.add((task_id, name))
+            to_send.append((task, name))
+
+        sent = 0
+        for task, name in to_send:
+            # The unique (task, threshold) row is the claim: if another sweeper
+            # recorded it first, it also sends the message. Claim and notify
+            # share a transaction so a queued reminder is never lost.
+            try:
+                with transaction.atomic():
+                    _, created = TaskReminder.objects.get_or_create(
+                        task=task, threshold=name
+                    )
+                    if created:
+                        self.notify(task, name)
+            except Exception as e:
+                logger.error(f"Failed to send {name} reminder for task {task.id}: {e}")
+                continue
+            sent += created
+
+        return sent
+
+    def run_once(self, now=None):
+        now = now or timezone.now()
+        self.refill(now)
+        return self.fire(self.pop_due(now))
+
+    def seconds_until_next(self, now=None, maximum=60):
+        """How long the caller can sleep before the next reminder is due"""
+        now = now or timezone.now()
+        if not self.heap:
+            return maximum
+        wait = (self.heap[0][0] - now).total_seconds()
+        return max(0, min(wait, maximum))
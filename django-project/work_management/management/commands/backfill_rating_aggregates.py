@@ -0,0 +1,70 @@
+"""
+Recompute worker rating aggregates from the ratings table.
+
+Usage:
+    python manage.py backfill_rating_aggregates
+    python manage.py backfill_rating_aggregates --batch-size 1000
+
+Rating counts and sums for every worker are computed in a single GROUP BY
+query, then written back with bulk updates. Run it once after adding the
+rating_count / rating_sum columns, or any time the aggregates drift.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Sum
+from work_management.models import Rating
+from workers.users_models import WorkerProfile
+
+
+class Command(BaseCommand):
+    help = "Recompute rating_count, rating_sum, average_rating and reputation_score"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of profiles written per bulk update",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        aggregates = {
+            row["worker_id"]: (row["count"], row["total"])
+            for row in Rating.objects.order_by()
+            .values("worker_id")
+            .annotate(count=Count("id"), total=Sum("score"))
+        }
+        self.stdout.write(f"Aggregated ratings for {len(aggregates)} workers")
+
+        fields = ["rating_count", "rating_sum", "average_rating", "reputation_score"]
+        profiles = WorkerProfile.objects.filter(user__isnull=False).only(
+            "id", "user_id", "total_tasks_completed", "total_tasks_assigned", *fields
+        )
+
+        changed = []
+        updated = 0
+        with transaction.atomic():
+            for profile in profiles.iterator(chunk_size=batch_size):
+                count, total = aggregates.get(profile.user_id, (0, 0))
+                before = [float(getattr(profile, field)) for field in fields]
+
+                profile.rating_count = count
+                profile.rating_sum = total
+                profile.refresh_rating_stats()
+
+                if [float(getattr(profile, field)) for field in fields] != before:
+                    changed.append(profile)
+
+                if len(changed) >= batch_size:
+                    WorkerProfile.objects.bulk_update(changed, fields)
+                    updated += len(changed)
+                    changed = []
+
+            if changed:
+                WorkerProfile.objects.bulk_update(changed, fields)
+                updated += len(changed)
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {updated} worker profiles"))
@@ -0,0 +1,56 @@
+"""
+Fill the denormalized latest progress on tasks from their progress history.
+
+Usage:
+    python manage.py backfill_task_progress
+    python manage.py backfill_task_progress --batch-size 1000
+
+Each batch of tasks is updated with a single UPDATE that copies the
+percentage and timestamp of the task's most recent TaskProgress row, or
+resets them to 0 / NULL for tasks without any. Run it once after adding
+the latest_progress_percentage / latest_progress_at columns, or any time
+they drift.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from work_management.models import Task, TaskProgress
+
+
+class Command(BaseCommand):
+    help = "Recompute latest_progress_percentage and latest_progress_at on tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of tasks written per UPDATE",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        latest = TaskProgress.objects.filter(task_id=OuterRef("pk")).order_by(
+            "-timestamp", "-id"
+        )
+        values = {
+            "latest_progress_percentage": Coalesce(
+                Subquery(latest.values("progress_percentage")[:1]), Value(0)
+            ),
+            "latest_progress_at": Subquery(latest.values("timestamp")[:1]),
+        }
+
+        ids = list(Task.objects.order_by("pk").values_list("pk", flat=True))
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start : start + batch_size]
+            updated += Task.objects.filter(pk__in=batch).update(**values)
+
+        with_progress = Task.objects.filter(latest_progress_at__isnull=False).count()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {updated} tasks, {with_progress} with progress updates"
+            )
+        )
@@ -0,0 +1,91 @@
+"""
+Recompute worker and supervisor task counters from the tasks table.
+
+Usage:
+    python manage.py reconcile_task_counters
+
+Each counter is rebuilt with a single UPDATE per profile table using
+correlated COUNT subqueries, so the cost does not depend on the number of
+profiles loaded into Python:
+
+- WorkerProfile.total_tasks_assigned: tasks currently assigned to the worker
+- WorkerProfile.total_tasks_completed: completed tasks assigned to the worker
+- SupervisorProfile.total_tasks_created: tasks created by the supervisor
+- SupervisorProfile.total_workers_supervised: SupervisorWorker links of the
+  supervisor
+
+Missing SupervisorWorker links are first backfilled from the distinct
+(created_by, assigned_to) pairs currently present on tasks.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from work_management.models import SupervisorProfile, SupervisorWorker, Task
+from workers.users_models import WorkerProfile
+
+
+def count_rows(queryset, group_field, count_expression, **filters):
+    """Correlated subquery counting rows per profile user"""
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{group_field: OuterRef("user_id")}, **filters)
+            .order_by()
+            .values(group_field)
+            .annotate(total=count_expression)
+            .values("total"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute task counters on worker and supervisor profiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of SupervisorWorker links inserted per statement",
+        )
+
+    def handle(self, *args, **options):
+        pairs = (
+            Task.objects.filter(assigned_to__isnull=False)
+            .order_by()
+            .values_list("created_by_id", "assigned_to_id")
+            .distinct()
+        )
+        links = [
+            SupervisorWorker(supervisor_id=supervisor_id, worker_id=worker_id)
+            for supervisor_id, worker_id in pairs.iterator()
+        ]
+
+        with transaction.atomic():
+            SupervisorWorker.objects.bulk_create(
+                links, batch_size=options["batch_size"], ignore_conflicts=True
+            )
+            workers = WorkerProfile.objects.filter(user__isnull=False).update(
+                total_tasks_assigned=count_rows(
+                    Task.objects, "assigned_to", Count("id")
+                ),
+                total_tasks_completed=count_rows(
+                    Task.objects, "assigned_to", Count("id"), status=Task.COMPLETED
+                ),
+            )
+            supervisors = SupervisorProfile.objects.update(
+                total_tasks_created=count_rows(Task.objects, "created_by", Count("id")),
+                total_workers_supervised=count_rows(
+                    SupervisorWorker.objects, "supervisor", Count("id")
+                ),
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled counters for {workers} workers "
+                f"and {supervisors} supervisors"
+            )
+        )
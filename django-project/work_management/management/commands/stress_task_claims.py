@@ -0,0 +1,148 @@
+"""
+Concurrency stress check for task claiming.
+
+Usage:
+    python manage.py stress_task_claims
+    python manage.py stress_task_claims --tasks 50 --workers 200 --threads 32
+
+Creates a throwaway supervisor, workers and OPEN tasks, then lets every
+worker race to claim every task from a thread pool. Each claim reads the task
+and goes through work_management.transitions.assign, exactly like the API and
+the bot. The command fails unless every task ends up with exactly one winner
+and the worker counters add up. All created rows are removed afterwards
+unless --keep is given.
+"""
+
+import random
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection
+from django.db.models import Sum
+from work_management import transitions
+from work_management.models import SupervisorProfile, Task
+from workers.users_models import CustomUser as User, WorkerProfile
+
+
+class Command(BaseCommand):
+    help = "Race many workers claiming the same tasks and verify a single winner"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=20)
+        parser.add_argument("--workers", type=int, default=50)
+        parser.add_argument("--threads", type=int, default=16)
+        parser.add_argument(
+            "--keep", action="store_true", help="Keep the generated rows"
+        )
+
+    def handle(self, *args, **options):
+        run_id = uuid.uuid4().hex[:8]
+        supervisor, workers, tasks = self.create_fixtures(run_id, options)
+
+        try:
+            self.run_race(workers, tasks, options["threads"])
+        finally:
+            if not options["keep"]:
+                Task.objects.filter(created_by=supervisor).delete()
+                User.objects.filter(email__endswith=f"@stress-{run_id}.local").delete()
+
+    def create_fixtures(self, run_id, options):
+        domain = f"stress-{run_id}.local"
+        supervisor = User.objects.create(
+            email=f"supervisor@{domain}",
+            full_name="Stress Supervisor",
+            user_type="supervisor",
+        )
+        SupervisorProfile.objects.create(user=supervisor)
+
+        workers = User.objects.bulk_create(
+            [
+                User(
+                    email=f"worker{i}@{domain}",
+                    full_name=f"Stress Worker {i}",
+                    user_type="worker",
+                )
+                for i in range(options["workers"])
+            ]
+        )
+        WorkerProfile.objects.bulk_create(
+            [
+                WorkerProfile(user=worker, full_name=worker.full_name, phone_number="")
+                for worker in workers
+            ]
+        )
+
+        tasks = Task.objects.bulk_create(
+            [
+                Task(
+                    created_by=supervisor,
+                    title=f"Stress task {i}",
+                    description="Generated by stress_task_claims",
+                )
+                for i in range(options["tasks"])
+            ]
+        )
+        return supervisor, workers, tasks
+
+    def run_race(self, workers, tasks, threads):
+        task_ids = [task.id for task in tasks]
+        start = threading.Event()
+        lock = threading.Lock()
+        stats = {"won": 0, "lost": 0, "errors": 0}
+
+        def claim_all(worker):
+            start.wait()
+            try:
+                for task_id in random.sample(task_ids, len(task_ids)):
+                    task = Task.objects.get(id=task_id)
+                    try:
+                        won = transitions.assign(task, worker)
+                    except OperationalError:
+                        # SQLite reports write contention as "database is locked"
+                        with lock:
+                            stats["errors"] += 1
+                        continue
+                    with lock:
+                        stats["won" if won else "lost"] += 1
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            futures = [pool.submit(claim_all, worker) for worker in workers]
+            started = time.perf_counter()
+            start.set()
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - started
+
+        attempts = stats["won"] + stats["lost"] + stats["errors"]
+        self.stdout.write(
+            f"{attempts} claim attempts in {elapsed:.2f}s "
+            f"({attempts / elapsed:.0f}/s): {stats['won']} won, "
+            f"{stats['lost']} lost, {stats['errors']} db errors"
+        )
+
+        assigned = Task.objects.filter(id__in=task_ids, status=Task.ASSIGNED)
+        unassigned = len(task_ids) - assigned.count()
+        counted = WorkerProfile.objects.filter(user__in=workers).aggregate(
+            total=Sum("total_tasks_assigned")
+        )["total"]
+
+        if stats["won"] != len(task_ids) - unassigned:
+            raise CommandError(
+                f"{stats['won']} claims reported success for "
+                f"{len(task_ids) - unassigned} assigned tasks"
+            )
+        if counted != stats["won"]:
+            raise CommandError(
+                f"Worker counters sum to {counted}, expected {stats['won']}"
+            )
+        if unassigned:
+            raise CommandError(f"{unassigned} tasks were never claimed")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Every one of {len(task_ids)} tasks has one winner")
+        )
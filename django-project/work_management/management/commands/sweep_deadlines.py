@@ -0,0 +1,78 @@
+"""
+Send deadline reminders for assigned and in-progress tasks.
+
+Usage:
+    python manage.py sweep_deadlines            # run forever
+    python manage.py sweep_deadlines --once     # single sweep, e.g. from cron
+
+Reminders go to the assigned worker and the supervisor who created the task,
+at most once per task for each threshold (24h before, 1h before and once
+overdue by default; override with the TASK_DEADLINE_REMINDERS setting as
+{"name": seconds_before_deadline}). Messages are queued in the notification
+outbox and delivered by dispatch_notifications.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from telegram_bot import outbox
+from work_management.deadlines import DeadlineScheduler
+
+
+def send_reminder(task, threshold):
+    recipients = {
+        user.telegram_id
+        for user in (task.assigned_to, task.created_by)
+        if user is not None and user.telegram_id
+    }
+    for telegram_id in recipients:
+        outbox.enqueue(
+            "deadline_reminder",
+            telegram_id,
+            dedupe_key=f"deadline:{task.id}:{threshold}:{telegram_id}",
+            task_title=task.title,
+            task_id=task.id,
+            deadline=task.deadline,
+            threshold=threshold,
+        )
+
+
+class Command(BaseCommand):
+    help = "Send task deadline reminders"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true", help="Run a single sweep and exit"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Tasks read per query when extending the schedule",
+        )
+        parser.add_argument(
+            "--max-sleep",
+            type=int,
+            default=60,
+            help="Longest pause between sweeps, in seconds",
+        )
+
+    def handle(self, *args, **options):
+        scheduler = DeadlineScheduler(
+            notify=send_reminder, batch_size=options["batch_size"]
+        )
+
+        if options["once"]:
+            sent = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f"Sent {sent} reminders"))
+            return
+
+        self.stdout.write("Deadline sweeper started")
+        try:
+            while True:
+                sent = scheduler.run_once()
+                if sent:
+                    self.stdout.write(f"Sent {sent} reminders")
+                time.sleep(scheduler.seconds_until_next(maximum=options["max_sleep"]))
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING("\nDeadline sweeper stopped"))
@@ -2,8 +2,9 @@
 Models for managing jobs, tasks, and progress tracking in the work management system.
 """
 
-from django.db import models
-from django.db.models import Avg
+from django.db import models, transaction
+from django.db.models import F, Q
+from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from workers.users_models import CustomUser as User, WorkerProfile
 from core.abstracts import CreatedModifiedAbstract
@@ -134,14 +135,121 @@ class Task(CreatedModifiedAbstract):
     assigned_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
 
+    # Copied from the newest TaskProgress row so lists don't read task_progress
+    latest_progress_percentage = models.IntegerField(default=0)
+    latest_progress_at = models.DateTimeField(null=True, blank=True)
+
     class Meta:
         db_table = "tasks"
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "deadline"]),
+        ]
 
     def __str__(self):
         return f"Task #{self.id}: {self.title} ({self.status})"
 
 
+class SupervisorWorker(CreatedModifiedAbstract):
+    """Workers a supervisor has assigned tasks to, one row per pair"""
+
+    supervisor = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="worker_links"
+    )
+    worker = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="supervisor_links"
+    )
+
+    class Meta:
+        db_table = "supervisor_workers"
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["supervisor", "worker"], name="unique_supervisor_worker"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.supervisor_id} supervises {self.worker_id}"
+
+    @classmethod
+    def link(cls, supervisor_id, worker_id):
+        """Record the pair if absent; returns True when this call created it"""
+        _, created = cls.objects.get_or_create(
+            supervisor_id=supervisor_id, worker_id=worker_id
+        )
+        return created
+
+    @classmethod
+    def link_many(cls, supervisor_id, worker_ids):
+        """Record missing pairs in two queries; returns how many were new"""
+        existing = set(
+            cls.objects.filter(
+                supervisor_id=supervisor_id, worker_id__in=worker_ids
+            ).values_list("worker_id", flat=True)
+        )
+        new_ids = set(worker_ids) - existing
+        cls.objects.bulk_create(
+            [cls(supervisor_id=supervisor_id, worker_id=w) for w in new_ids],
+            ignore_conflicts=True,
+        )
+        return len(new_ids)
+
+
+class TaskEvent(models.Model):
+    """Append-only log of task status transitions"""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="events")
+    # Copied from the task so analytics can filter without joining tasks
+    category = models.ForeignKey(
+        JobCategory,
+        on_delete=models.SET_NULL,
+        related_name="task_events",
+        null=True,
+        blank=True,
+    )
+    supervisor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="task_events",
+    )
+    from_status = models.CharField(
+        max_length=20, choices=Task.STATUS_CHOICES, blank=True, null=True
+    )
+    to_status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    ts = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "task_events"
+        ordering = ["ts"]
+        indexes = [
+            models.Index(fields=["task", "ts"]),
+            models.Index(fields=["category", "to_status", "ts"]),
+        ]
+
+    def __str__(self):
+        return f"Task #{self.task_id}: {self.from_status} -> {self.to_status}"
+
+
+class TaskReminder(models.Model):
+    """Deadline reminders already sent, at most one per task and threshold"""
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="reminders")
+    threshold = models.CharField(max_length=20)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "task_reminders"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["task", "threshold"], name="unique_task_reminder"
+            )
+        ]
+
+    def __str__(self):
+        return f"Reminder {self.threshold} for Task #{self.task_id}"
+
+
 class TaskProgress(CreatedModifiedAbstract):
     """Track progress updates for tasks"""
 
@@ -158,10 +266,28 @@ class TaskProgress(CreatedModifiedAbstract):
     class Meta:
         db_table = "task_progress"
         ordering = ["timestamp"]
+        indexes = [
+            models.Index(fields=["task", "timestamp"]),
+        ]
 
     def __str__(self):
         return f"Progress for Task #{self.task.id} - {self.progress_percentage}%"
 
+    def save(self, *args, **kwargs):
+        """Keep the task's latest progress columns in step with new updates"""
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                Task.objects.filter(
+                    Q(latest_progress_at__isnull=True)
+                    | Q(latest_progress_at__lte=self.timestamp),
+                    pk=self.task_id,
+                ).update(
+                    latest_progress_percentage=self.progress_percentage,
+                    latest_progress_at=self.timestamp,
+                )
+
 
 class Rating(CreatedModifiedAbstract):
     """Rating given by supervisor to worker after task completion"""
@@ -187,27 +313,80 @@ class Rating(CreatedModifiedAbstract):
     def __str__(self):
         return f"Rating for Task #{self.task.id}: {self.score}/5"
 
+    # Score as last read from / written to the database, used to compute deltas
+    _stored_score = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "score" in field_names:
+            instance._stored_score = values[field_names.index("score")]
+        return instance
+
     def save(self, *args, **kwargs):
-        """Update worker's reputation after saving rating"""
-        super().save(*args, **kwargs)
-        self._update_worker_reputation()
-
-    def _update_worker_reputation(self):
-        """Recalculate and update worker's average rating and reputation"""
-        if hasattr(self.worker, "worker_profile"):
-            worker_profile = self.worker.worker_profile
-            avg_rating = Rating.objects.filter(worker=self.worker).aggregate(
-                avg=Avg("score")
-            )["avg"]
-
-            if hasattr(worker_profile, "average_rating"):
-                worker_profile.average_rating = (
-                    round(avg_rating, 2) if avg_rating else 0
+        """
+        Update worker's reputation after saving rating. Deletes are handled
+        by ``work_management.signals`` so cascades and queryset deletes count.
+        """
+        adding = self._state.adding
+        with transaction.atomic():
+            if not adding and self._stored_score is None:
+                self._stored_score = (
+                    Rating.objects.filter(pk=self.pk)
+                    .values_list("score", flat=True)
+                    .first()
                 )
-
-            if hasattr(worker_profile, "update_reputation") and callable(
-                worker_profile.update_reputation
-            ):
-                worker_profile.update_reputation()
-            else:
-                worker_profile.save()
+            super().save(*args, **kwargs)
+            if adding:
+                self._update_worker_reputation(count_delta=1, score_delta=self.score)
+            elif self._stored_score not in (None, self.score):
+                self._update_worker_reputation(
+                    count_delta=0, score_delta=self.score - self._stored_score
+                )
+            self._invalidate_summaries()
+        self._stored_score = self.score
+
+    def stored_score(self):
+        """Score as it is in the database, for deltas when the row goes away"""
+        return self.score if self._stored_score is None else self._stored_score
+
+    def _invalidate_summaries(self):
+        """Drop cached task summaries that include this rating's stats"""
+        from . import summary
+
+        if Rating.task.is_cached(self):
+            created_by_id = self.task.created_by_id
+        else:
+            created_by_id = (
+                Task.objects.filter(pk=self.task_id)
+                .values_list("created_by_id", flat=True)
+                .first()
+            )
+        summary.invalidate(created_by_id, self.worker_id, self.supervisor_id)
+
+    def _update_worker_reputation(self, count_delta, score_delta):
+        """Apply a delta to the worker's rating aggregates and refresh reputation"""
+        updated = WorkerProfile.objects.filter(user_id=self.worker_id).update(
+            rating_count=F("rating_count") + count_delta,
+            rating_sum=F("rating_sum") + score_delta,
+        )
+        if not updated:
+            return
+
+        worker_profile = (
+            WorkerProfile.objects.select_for_update()
+            .only(
+                "id",
+                # Read by the post_save receivers, so don't leave it deferred
+                "user_id",
+                "rating_count",
+                "rating_sum",
+                "total_tasks_completed",
+                "total_tasks_assigned",
+            )
+            .get(user_id=self.worker_id)
+        )
+        worker_profile.refresh_rating_stats()
+        worker_profile.save(
+            update_fields=["average_rating", "reputation_score", "updated_at"]
+        )
@@ -2,8 +2,25 @@
 Serializers for work management models.
 """
 
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Task, TaskProgress, Rating, JobCategory, Job, SupervisorProfile
+from workers.users_models import CustomUser as User
+from . import summary
+from .counters import CounterUpdates
+from .models import (
+    Role,
+    Task,
+    TaskEvent,
+    TaskProgress,
+    Rating,
+    JobCategory,
+    Job,
+    SupervisorProfile,
+    SupervisorWorker,
+)
 from workers.serializers import WorkerProfileSerializer
 
 
@@ -23,6 +40,23 @@ class SupervisorProfileSerializer(serializers.ModelSerializer):
         ]
 
 
+class SupervisorWorkerSerializer(serializers.ModelSerializer):
+    worker_name = serializers.CharField(source="worker.full_name", read_only=True)
+    worker_telegram_id = serializers.IntegerField(
+        source="worker.telegram_id", read_only=True
+    )
+
+    class Meta:
+        model = SupervisorWorker
+        fields = [
+            "worker",
+            "worker_name",
+            "worker_telegram_id",
+            "created_at",
+        ]
+        read_only_fields = fields
+
+
 class JobCategorySerializer(serializers.ModelSerializer):
     jobs_count = serializers.SerializerMethodField()
 
@@ -108,7 +142,6 @@ class TaskSerializer(serializers.ModelSerializer):
     )
     category_name = serializers.CharField(source="category.name", read_only=True)
     job_title = serializers.CharField(source="job.title", read_only=True)
-    progress_updates = TaskProgressSerializer(many=True, read_only=True)
     rating = RatingSerializer(read_only=True)
 
     class Meta:
@@ -132,7 +165,8 @@ class TaskSerializer(serializers.ModelSerializer):
             "assigned_at",
             "completed_at",
             "updated_at",
-            "progress_updates",
+            "latest_progress_percentage",
+            "latest_progress_at",
             "rating",
         ]
         read_only_fields = [
@@ -141,9 +175,18 @@ class TaskSerializer(serializers.ModelSerializer):
             "assigned_at",
             "completed_at",
             "updated_at",
+            "latest_progress_percentage",
+            "latest_progress_at",
         ]
 
 
+class TaskDetailSerializer(TaskSerializer):
+    progress_updates = TaskProgressSerializer(many=True, read_only=True)
+
+    class Meta(TaskSerializer.Meta):
+        fields = TaskSerializer.Meta.fields + ["progress_updates"]
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
@@ -158,3 +201,158 @@ class TaskCreateSerializer(serializers.ModelSerializer):
             "location",
         ]
         read_only_fields = ["id"]
+
+
+class BulkTaskItemSerializer(serializers.Serializer):
+    """
+    One task in a bulk request. Foreign keys are plain ids here and are
+    resolved for the whole batch at once by TaskBulkCreateSerializer.
+    """
+
+    created_by = serializers.UUIDField()
+    assigned_to = serializers.UUIDField(required=False, allow_null=True)
+    category = serializers.IntegerField(required=False, allow_null=True)
+    job = serializers.IntegerField(required=False, allow_null=True)
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField()
+    deadline = serializers.DateTimeField(required=False, allow_null=True)
+    location = serializers.CharField(
+        max_length=255, required=False, allow_blank=True, allow_null=True
+    )
+
+
+class TaskBulkCreateSerializer(serializers.Serializer):
+    """
+    Accepts either an explicit list of tasks, or a template repeated ``count``
+    times or once per worker in ``workers``.
+    """
+
+    MAX_TASKS = 500
+
+    tasks = BulkTaskItemSerializer(many=True, required=False)
+    template = BulkTaskItemSerializer(required=False)
+    count = serializers.IntegerField(required=False, min_value=1, max_value=MAX_TASKS)
+    workers = serializers.ListField(
+        child=serializers.UUIDField(), required=False, max_length=MAX_TASKS
+    )
+
+    def validate(self, attrs):
+        if "tasks" in attrs:
+            if "template" in attrs:
+                raise serializers.ValidationError(
+                    "Provide either tasks or template, not both"
+                )
+            items = attrs["tasks"]
+        elif "template" in attrs:
+            template = attrs["template"]
+            if "workers" in attrs:
+                items = [
+                    {**template, "assigned_to": worker_id}
+                    for worker_id in attrs["workers"]
+                ]
+            else:
+                items = [dict(template) for _ in range(attrs.get("count", 1))]
+        else:
+            raise serializers.ValidationError("Either tasks or template is required")
+
+        if not items:
+            raise serializers.ValidationError("No tasks provided")
+        if len(items) > self.MAX_TASKS:
+            raise serializers.ValidationError(
+                f"Maximum {self.MAX_TASKS} tasks per request"
+            )
+
+        users = User.objects.in_bulk(
+            {item["created_by"] for item in items}
+            | {item["assigned_to"] for item in items if item.get("assigned_to")}
+        )
+        categories = JobCategory.objects.in_bulk(
+            {item["category"] for item in items if item.get("category")}
+        )
+        jobs = Job.objects.in_bulk({item["job"] for item in items if item.get("job")})
+
+        errors = {}
+        for index, item in enumerate(items):
+            creator = users.get(item["created_by"])
+            worker = users.get(item["assigned_to"]) if item.get("assigned_to") else None
+            if creator is None:
+                errors[index] = "created_by user not found"
+            elif item.get("assigned_to") and (
+                worker is None or worker.user_type != Role.WORKER
+            ):
+                errors[index] = "assigned_to worker not found"
+            elif item.get("category") and item["category"] not in categories:
+                errors[index] = "category not found"
+            elif item.get("job") and item["job"] not in jobs:
+                errors[index] = "job not found"
+        if errors:
+            raise serializers.ValidationError({"tasks": errors})
+
+        attrs["items"] = items
+        attrs["users"] = users
+        return attrs
+
+    def create(self, validated_data):
+        now = timezone.now()
+        users = validated_data["users"]
+        tasks = [
+            Task(
+                created_by=users[item["created_by"]],
+                assigned_to=users.get(item.get("assigned_to")),
+                category_id=item.get("category"),
+                job_id=item.get("job"),
+                title=item["title"],
+                description=item["description"],
+                deadline=item.get("deadline"),
+                location=item.get("location"),
+                status=Task.ASSIGNED if item.get("assigned_to") else Task.OPEN,
+                assigned_at=now if item.get("assigned_to") else None,
+            )
+            for item in validated_data["items"]
+        ]
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+
+            events = []
+            supervised = defaultdict(set)
+            for task in tasks:
+                events.append(
+                    TaskEvent(
+                        task=task,
+                        category_id=task.category_id,
+                        supervisor_id=task.created_by_id,
+                        from_status=None,
+                        to_status=Task.OPEN,
+                        ts=task.created_at,
+                    )
+                )
+                if task.assigned_to_id:
+                    events.append(
+                        TaskEvent(
+                            task=task,
+                            category_id=task.category_id,
+                            supervisor_id=task.created_by_id,
+                            from_status=Task.OPEN,
+                            to_status=Task.ASSIGNED,
+                            ts=now,
+                        )
+                    )
+                    supervised[task.created_by_id].add(task.assigned_to_id)
+            TaskEvent.objects.bulk_create(events)
+            summary.invalidate(
+                *(task.created_by_id for task in tasks),
+                *(task.assigned_to_id for task in tasks),
+            )
+
+            with CounterUpdates() as counters:
+                for task in tasks:
+                    counters.task_created(task.created_by_id)
+                    counters.task_assigned(task.assigned_to_id)
+                for supervisor_id, worker_ids in supervised.items():
+                    counters.worker_supervised(
+                        supervisor_id,
+                        SupervisorWorker.link_many(supervisor_id, worker_ids),
+                    )
+
+        return tasks
@@ -0,0 +1,21 @@
+"""
+Keep worker rating aggregates correct however a rating is deleted.
+
+``Rating.delete()`` isn't called when a rating goes away with its task or
+worker, or through ``Rating.objects.filter(...).delete()``, but
+``post_delete`` is sent for every row in all of those cases, inside the
+deleting transaction.
+"""
+
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from work_management.models import Rating
+
+
+@receiver(post_delete, sender=Rating)
+def rating_deleted(sender, instance, **kwargs):
+    instance._update_worker_reputation(
+        count_delta=-1, score_delta=-instance.stored_score()
+    )
+    instance._invalidate_summaries()
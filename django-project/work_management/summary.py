@@ -0,0 +1,97 @@
+"""
+Per-user task summaries for dashboards and the bot menu.
+
+Computing a summary takes two queries: a conditional aggregation over the
+user's tasks for the status counts and rating stats, and a small ordered
+query for the most recently touched tasks. Results are cached for a short
+time per user and dropped whenever one of the user's tasks is created,
+changes status or has its rating saved or deleted. Other processes may
+serve their local copy for a few seconds more (see ``core.cache``).
+"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+
+from core.cache import Namespace
+
+from .models import Role, Task
+
+RECENT_LIMIT = 5
+
+summaries = Namespace("task-summary")
+
+
+def get_timeout():
+    return getattr(settings, "TASK_SUMMARY_CACHE_SECONDS", 30)
+
+
+def cache_key(role, user_id):
+    return f"{role}:{user_id}"
+
+
+def invalidate(*user_ids):
+    """Drop cached summaries for the given users once the transaction commits"""
+    keys = [
+        cache_key(role, user_id)
+        for user_id in set(user_ids)
+        if user_id is not None
+        for role in (Role.WORKER, Role.SUPERVISOR)
+    ]
+    if keys:
+        transaction.on_commit(lambda: summaries.delete_many(keys))
+
+
+def compute_summary(user_id, role):
+    """Summary for ``role`` ("worker" or "supervisor"), in two queries"""
+    if role == Role.SUPERVISOR:
+        tasks = Task.objects.filter(created_by_id=user_id)
+    else:
+        tasks = Task.objects.filter(assigned_to_id=user_id)
+
+    totals = tasks.aggregate(
+        total=Count("id"),
+        **{
+            status.lower(): Count("id", filter=Q(status=status))
+            for status, _ in Task.STATUS_CHOICES
+        },
+        rated=Count("rating"),
+        average_rating=Avg("rating__score"),
+    )
+
+    recent = tasks.order_by("-updated_at").values(
+        "id", "title", "status", "deadline", "updated_at", "latest_progress_percentage"
+    )[:RECENT_LIMIT]
+
+    average = totals.pop("average_rating")
+    rated = totals.pop("rated")
+    total = totals.pop("total")
+    return {
+        "user_id": str(user_id),
+        "role": role,
+        "total": total,
+        "by_status": totals,
+        "ratings": {
+            "count": rated,
+            "average": round(float(average), 2) if average is not None else None,
+        },
+        "recent": [
+            {
+                **task,
+                "deadline": task["deadline"].isoformat() if task["deadline"] else None,
+                "updated_at": task["updated_at"].isoformat(),
+            }
+            for task in recent
+        ],
+    }
+
+
+def get_summary(user_id, role):
+    """Cached summary of a worker's assigned or a supervisor's created tasks"""
+    # Bot users carry upper-case roles ("WORKER")
+    role = role.lower()
+    return summaries.get_or_set(
+        cache_key(role, user_id),
+        lambda: compute_summary(user_id, role),
+        get_timeout(),
+    )
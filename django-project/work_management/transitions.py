@@ -0,0 +1,131 @@
+"""
+Task state transitions as compare-and-swap updates.
+
+Every status change goes through ``transition``, which issues
+
+    UPDATE tasks SET status = <new>, ... WHERE id = <id> AND status = <old>
+
+and only reports success when that single statement changed the row. Two
+supervisors assigning the same task, or a double-tapped Telegram button, can
+both read an OPEN task, but only one of them wins the update; the other gets
+``False`` back without any locks being held.
+
+Successful transitions are appended to the TaskEvent log in the same
+transaction, and the cached summaries of the users involved are dropped.
+"""
+
+from django.db import transaction
+from django.utils import timezone
+
+from . import summary
+from .counters import CounterUpdates
+from .models import SupervisorWorker, Task, TaskEvent
+
+ALLOWED_TRANSITIONS = {
+    Task.OPEN: {Task.ASSIGNED, Task.CANCELLED},
+    Task.ASSIGNED: {
+        Task.OPEN,
+        Task.IN_PROGRESS,
+        Task.SUBMITTED,
+        Task.COMPLETED,
+        Task.CANCELLED,
+    },
+    Task.IN_PROGRESS: {Task.OPEN, Task.SUBMITTED, Task.COMPLETED, Task.CANCELLED},
+    Task.SUBMITTED: {Task.IN_PROGRESS, Task.COMPLETED, Task.CANCELLED},
+    Task.COMPLETED: set(),
+    Task.CANCELLED: {Task.OPEN},
+}
+
+# Statuses a worker holds a task in, which going back to OPEN releases
+RELEASABLE = {Task.ASSIGNED, Task.IN_PROGRESS}
+
+
+def can_transition(from_status, to_status):
+    return to_status in ALLOWED_TRANSITIONS.get(from_status, set())
+
+
+def transition(task, to_status, **changes):
+    """
+    Move a task from the status it was read with to ``to_status``.
+
+    Extra ``changes`` are written in the same UPDATE. On success the instance
+    is updated in memory, profile counters are bumped and True is returned;
+    False means the transition is not allowed or another request got there
+    first. Moving to ASSIGNED needs an ``assigned_to`` and moving to OPEN
+    clears it, so use ``assign`` and ``unassign`` for those.
+    """
+    from_status = task.status
+    if not can_transition(from_status, to_status):
+        return False
+    if to_status == Task.ASSIGNED and not changes.get("assigned_to"):
+        return False
+    if to_status == Task.OPEN:
+        changes.update(assigned_to=None, assigned_at=None)
+    previous_assignee_id = task.assigned_to_id
+
+    now = timezone.now()
+    if to_status == Task.COMPLETED:
+        changes.setdefault("completed_at", now)
+
+    with transaction.atomic():
+        updated = Task.objects.filter(pk=task.pk, status=from_status).update(
+            status=to_status, updated_at=now, **changes
+        )
+        if not updated:
+            return False
+
+        task.status = to_status
+        task.updated_at = now
+        for field, value in changes.items():
+            setattr(task, field, value)
+
+        log_event(task, from_status, to_status, now)
+        summary.invalidate(
+            task.created_by_id, task.assigned_to_id, previous_assignee_id
+        )
+
+        with CounterUpdates() as counters:
+            if to_status == Task.ASSIGNED and task.assigned_to_id:
+                counters.task_assigned(task.assigned_to_id)
+                if SupervisorWorker.link(task.created_by_id, task.assigned_to_id):
+                    counters.worker_supervised(task.created_by_id)
+
+            # Releasing a task takes back the assignment it counted
+            if to_status == Task.OPEN and from_status in RELEASABLE:
+                counters.task_assigned(previous_assignee_id, -1)
+
+            if to_status == Task.COMPLETED and task.assigned_to_id:
+                counters.task_completed(task.assigned_to_id)
+
+    return True
+
+
+def log_event(task, from_status, to_status, ts=None):
+    return TaskEvent.objects.create(
+        task_id=task.pk,
+        category_id=task.category_id,
+        supervisor_id=task.created_by_id,
+        from_status=from_status,
+        to_status=to_status,
+        ts=ts or timezone.now(),
+    )
+
+
+def log_created(task):
+    """Record the initial OPEN state of a newly created task"""
+    summary.invalidate(task.created_by_id)
+    return log_event(task, None, task.status, task.created_at)
+
+
+def assign(task, worker):
+    """Claim an OPEN task for ``worker``"""
+    if task.status != Task.OPEN:
+        return False
+    return transition(
+        task, Task.ASSIGNED, assigned_to=worker, assigned_at=timezone.now()
+    )
+
+
+def unassign(task):
+    """Release an assigned task back to OPEN"""
+    return transition(task, Task.OPEN, assigned_to=None, assigned_at=None)
@@ -2,30 +2,44 @@
 Views for work management app.
 """
 
+from collections import defaultdict
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from .models import Task, TaskProgress, Rating, JobCategory, Job, Role
+from django.utils.dateparse import parse_datetime
+from .models import (
+    Task,
+    TaskProgress,
+    Rating,
+    JobCategory,
+    Job,
+    Role,
+    SupervisorWorker,
+    TaskEvent,
+)
+from . import analytics, summary, transitions
+from .counters import CounterUpdates
 from .serializers import (
     TaskSerializer,
+    TaskDetailSerializer,
     TaskCreateSerializer,
+    TaskBulkCreateSerializer,
     TaskProgressSerializer,
     RatingSerializer,
     JobCategorySerializer,
     JobSerializer,
+    SupervisorWorkerSerializer,
 )
 from workers.users_models import CustomUser as User
-from telegram_bot.notifications import (
-    notify_task_assigned,
-    notify_task_status_updated,
-    notify_task_completed,
-)
-
-from rest_framework.permissions import AllowAny
+from telegram_bot import outbox
 
-from asgiref.sync import async_to_sync
+from rest_framework.permissions import AllowAny, IsAuthenticated
 
 
 class JobCategoryViewSet(viewsets.ReadOnlyModelViewSet):
@@ -55,16 +69,65 @@ class JobViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(serializer.data)
 
 
+class TaskProgressPagination(CursorPagination):
+    """Keyset pages over the (task, timestamp) index, oldest first"""
+
+    ordering = ("timestamp", "id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
 class TaskViewSet(viewsets.ModelViewSet):
-    queryset = Task.objects.all().select_related("created_by", "assigned_to")
+    queryset = Task.objects.all().select_related(
+        "created_by", "assigned_to", "category", "job"
+    )
     serializer_class = TaskSerializer
     permission_classes = [AllowAny]
 
     def get_serializer_class(self):
         if self.action == "create":
             return TaskCreateSerializer
+        if self.action == "retrieve":
+            return TaskDetailSerializer
         return TaskSerializer
 
+    def perform_create(self, serializer):
+        task = serializer.save()
+        transitions.log_created(task)
+
+        with CounterUpdates() as counters:
+            counters.task_created(task.created_by_id)
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    def bulk_create(self, request):
+        """Create many tasks at once from a list or a template"""
+        serializer = TaskBulkCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            tasks = serializer.save()
+
+            # one notification per worker, listing all of their new tasks
+            assigned = defaultdict(list)
+            for task in tasks:
+                if task.assigned_to and task.assigned_to.telegram_id:
+                    assigned[task.assigned_to].append(task)
+            for worker, worker_tasks in assigned.items():
+                outbox.enqueue(
+                    "tasks_assigned",
+                    worker.telegram_id,
+                    dedupe_key=f"tasks_assigned:{worker.id}:{worker_tasks[0].id}",
+                    tasks=[(task.id, task.title) for task in worker_tasks],
+                    supervisor_name=worker_tasks[0].created_by.full_name,
+                )
+
+        return Response(
+            {"created": len(tasks), "ids": [task.id for task in tasks]},
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=["get"], url_path="available")
     def available(self, request):
         """Get all unassigned tasks"""
@@ -81,6 +144,45 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = TaskSerializer(tasks, many=True)
         return Response(serializer.data)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="supervisor/(?P<supervisor_id>[^/.]+)/workers",
+    )
+    def supervisor_workers(self, request, supervisor_id=None):
+        """Get all workers a supervisor has assigned tasks to"""
+        links = SupervisorWorker.objects.filter(
+            supervisor_id=supervisor_id
+        ).select_related("worker")
+        serializer = SupervisorWorkerSerializer(links, many=True)
+        return Response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="supervisor/(?P<supervisor_id>[^/.]+)/summary",
+    )
+    def supervisor_summary(self, request, supervisor_id=None):
+        """Status counts, rating stats and recent tasks for a supervisor"""
+        return self._summary_response(supervisor_id, Role.SUPERVISOR)
+
+    @action(
+        detail=False, methods=["get"], url_path="worker/(?P<worker_id>[^/.]+)/summary"
+    )
+    def worker_summary(self, request, worker_id=None):
+        """Status counts, rating stats and recent tasks for a worker"""
+        return self._summary_response(worker_id, Role.WORKER)
+
+    def _summary_response(self, user_id, role):
+        try:
+            # Cached under the canonical form, which is what invalidate() uses
+            user_id = User._meta.pk.to_python(user_id)
+        except ValidationError:
+            return Response(
+                {"error": f"Invalid {role} id"}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(summary.get_summary(user_id, role))
+
     @action(detail=False, methods=["get"], url_path="worker/(?P<worker_id>[^/.]+)")
     def by_worker(self, request, worker_id=None):
         """Get all tasks assigned to a specific worker"""
@@ -88,13 +190,47 @@ class TaskViewSet(viewsets.ModelViewSet):
         serializer = TaskSerializer(tasks, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"], url_path="analytics/time-in-state")
+    def time_in_state(self, request):
+        """Time-in-state percentiles per category, supervisor and status"""
+        params = request.query_params
+        window = {}
+        for name in ("since", "until"):
+            if not params.get(name):
+                continue
+            try:
+                value = parse_datetime(params[name])
+            except ValueError:
+                value = None
+            if value is None:
+                return Response(
+                    {"error": "since and until must be ISO 8601 datetimes"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            window[name] = value
+
+        filters = {}
+        for name in ("category", "supervisor"):
+            if not params.get(name):
+                continue
+            field = TaskEvent._meta.get_field(name).target_field
+            try:
+                filters[f"{name}_id"] = field.to_python(params[name])
+            except ValidationError:
+                return Response(
+                    {"error": f"Invalid {name} id"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        data = analytics.time_in_state(**window, **filters)
+        return Response(data)
+
     @action(detail=True, methods=["post"], url_path="assign")
     def assign(self, request, pk=None):
         """Assign a task to a worker"""
-        task = self.get_object()
         worker_id = request.data.get("worker_id")
-        print(")))> Assigning task to worker_id:", worker_id)
-        print("00)> Request data:", request.data)
         if not worker_id:
             return Response(
                 {"error": "worker_id is required"}, status=status.HTTP_400_BAD_REQUEST
@@ -107,45 +243,76 @@ class TaskViewSet(viewsets.ModelViewSet):
                 {"error": "Worker not found"}, status=status.HTTP_404_NOT_FOUND
             )
 
+        return self._assign_to_worker(worker, claimed=False)
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="claim",
+        permission_classes=[IsAuthenticated],
+    )
+    def claim(self, request, pk=None):
+        """Let the authenticated worker claim an open task for themselves"""
+        if request.user.user_type != Role.WORKER:
+            return Response(
+                {"error": "Only workers can claim tasks"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        return self._assign_to_worker(request.user, claimed=True)
+
+    def _assign_to_worker(self, worker, claimed):
+        task = self.get_object()
+
         if task.status != Task.OPEN:
             return Response(
                 {"error": "Task is not available for assignment"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        task.assigned_to = worker
-        task.status = Task.ASSIGNED
-        task.assigned_at = timezone.now()
-        task.save()
-
-        if hasattr(worker, "worker_profile"):
-            worker.worker_profile.total_tasks_assigned += 1
-            worker.worker_profile.save()
-
-        if hasattr(task.created_by, "supervisor_profile"):
-            if (
-                task.created_by.supervisor_profile.total_workers_supervised == 0
-                or worker
-                not in User.objects.filter(assigned_tasks__created_by=task.created_by)
-            ):
-                task.created_by.supervisor_profile.total_workers_supervised += 1
-                task.created_by.supervisor_profile.save()
-
-        # send telegram notification
-        if hasattr(worker, "telegram_id") and worker.telegram_id:
-            async_to_sync(notify_task_assigned)(
-                worker_telegram_id=worker.telegram_id,
-                task_title=task.title,
-                supervisor_name=task.created_by.full_name,
-                task_id=task.id,
-            )
+        with transaction.atomic():
+            if not transitions.assign(task, worker):
+                return Response(
+                    {"error": "Task was assigned by another request"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            # queue telegram notification
+            if claimed:
+                # The worker knows; tell the supervisor who took the task
+                outbox.enqueue(
+                    "task_claimed",
+                    task.created_by.telegram_id,
+                    dedupe_key=f"task_claimed:{task.id}:{task.assigned_at.isoformat()}",
+                    task_title=task.title,
+                    worker_name=worker.full_name,
+                    task_id=task.id,
+                )
+            else:
+                outbox.enqueue(
+                    "task_assigned",
+                    worker.telegram_id,
+                    dedupe_key=f"task_assigned:{task.id}:{task.assigned_at.isoformat()}",
+                    task_title=task.title,
+                    supervisor_name=task.created_by.full_name,
+                    task_id=task.id,
+                )
 
         serializer = TaskSerializer(task)
         return Response(serializer.data)
 
     @action(detail=True, methods=["post"], url_path="update-status")
     def update_status(self, request, pk=None):
-        """Update task status"""
+        """
+        Update task status
+
+        Setting the status a task already has succeeds without changing
+        anything. Moves outside ``transitions.ALLOWED_TRANSITIONS``, such as
+        reopening a completed task, are rejected with 400; they used to be
+        saved and left the worker counters wrong. ASSIGNED is only reachable
+        through ``assign`` and ``claim``, which set the worker, and moving
+        back to OPEN also clears the assignment.
+        """
         task = self.get_object()
         new_status = request.data.get("status")
 
@@ -154,30 +321,46 @@ class TaskViewSet(viewsets.ModelViewSet):
                 {"error": "Invalid status"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        task.status = new_status
-
-        if new_status == Task.COMPLETED:
-            task.completed_at = timezone.now()
-
-            if task.assigned_to and hasattr(task.assigned_to, "worker_profile"):
-                task.assigned_to.worker_profile.total_tasks_completed += 1
-                task.assigned_to.worker_profile.save()
-
-        # notify supervisor about status change
-        if (
-            hasattr(task.created_by, "telegram_id")
-            and task.created_by.telegram_id
-            and task.assigned_to
-        ):
-            async_to_sync(notify_task_status_updated)(
-                supervisor_telegram_id=task.created_by.telegram_id,
-                task_title=task.title,
-                worker_name=task.assigned_to.full_name,
-                new_status=new_status,
-                task_id=task.id,
+        if new_status == task.status:
+            return Response(TaskSerializer(task).data)
+
+        if new_status == Task.ASSIGNED:
+            return Response(
+                {"error": "Use the assign or claim endpoint to assign a task"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if not transitions.can_transition(task.status, new_status):
+            return Response(
+                {"error": f"Cannot move task from {task.status} to {new_status}"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        task.save()
+        with transaction.atomic():
+            if new_status == Task.OPEN:
+                changed = transitions.unassign(task)
+            else:
+                changed = transitions.transition(task, new_status)
+            if not changed:
+                return Response(
+                    {"error": "Task status was changed by another request"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            # notify supervisor about status change
+            if task.assigned_to:
+                outbox.enqueue(
+                    "task_status_updated",
+                    task.created_by.telegram_id,
+                    dedupe_key=(
+                        f"task_status:{task.id}:{new_status}:"
+                        f"{task.updated_at.isoformat()}"
+                    ),
+                    task_title=task.title,
+                    worker_name=task.assigned_to.full_name,
+                    new_status=new_status,
+                    task_id=task.id,
+                )
 
         serializer = TaskSerializer(task)
         return Response(serializer.data)
@@ -191,16 +374,32 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         serializer = TaskProgressSerializer(data=data)
         if serializer.is_valid():
-            progress = serializer.save()
+            # The progress row and the first-progress transition commit together
+            with transaction.atomic():
+                serializer.save()
 
-            if task.status == Task.ASSIGNED:
-                task.status = Task.IN_PROGRESS
-                task.save()
+                if task.status == Task.ASSIGNED:
+                    transitions.transition(task, Task.IN_PROGRESS)
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @add_progress.mapping.get
+    def progress_timeline(self, request, pk=None):
+        """Paginated progress history of a task"""
+        if not Task.objects.filter(pk=pk).exists():
+            return Response(
+                {"error": "Task not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+
+        paginator = TaskProgressPagination()
+        page = paginator.paginate_queryset(
+            TaskProgress.objects.filter(task_id=pk), request, view=self
+        )
+        serializer = TaskProgressSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=["post"], url_path="rate")
     def rate(self, request, pk=None):
         """Rate a completed task"""
@@ -224,20 +423,19 @@ class TaskViewSet(viewsets.ModelViewSet):
 
         serializer = RatingSerializer(data=data)
         if serializer.is_valid():
-            rating = serializer.save()
-
-            # notify worker about rating
-            if (
-                task.assigned_to
-                and hasattr(task.assigned_to, "telegram_id")
-                and task.assigned_to.telegram_id
-            ):
-                async_to_sync(notify_task_completed)(
-                    worker_telegram_id=task.assigned_to.telegram_id,
-                    task_title=task.title,
-                    rating=rating.score,
-                    comment=rating.comment if rating.comment else None,
-                )
+            with transaction.atomic():
+                rating = serializer.save()
+
+                # notify worker about rating
+                if task.assigned_to:
+                    outbox.enqueue(
+                        "task_completed",
+                        task.assigned_to.telegram_id,
+                        dedupe_key=f"task_completed:{task.id}",
+                        task_title=task.title,
+                        rating=rating.score,
+                        comment=rating.comment if rating.comment else None,
+                    )
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
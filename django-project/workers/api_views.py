@@ -3,6 +3,8 @@ Public API Views for CPASS.
 
 These endpoints are consumed by external applications like TVET Dashboard.
 Authentication is via API Key (X-API-Key header).
+GET responses carry an ETag; clients that send it back in If-None-Match get
+304 Not Modified when nothing changed.
 
 Endpoints:
 - GET /api/public/workers/ - List workers affiliated with the institution
@@ -20,6 +22,7 @@ from rest_framework.decorators import (
 )
 from rest_framework.response import Response
 from rest_framework.permissions import BasePermission
+from django.views.decorators.http import conditional_page
 from django.utils import timezone
 from django.db.models import Count, Q
 
@@ -33,6 +36,7 @@ class IsAPIKeyAuthenticated(BasePermission):
         return request.auth is not None and isinstance(request.auth, TVETInstitution)
 
 
+@conditional_page
 @api_view(["GET"])
 @authentication_classes([APIKeyAuthentication])
 @permission_classes([IsAPIKeyAuthenticated])
@@ -119,6 +123,7 @@ def list_affiliated_workers(request):
     )
 
 
+@conditional_page
 @api_view(["GET"])
 @authentication_classes([APIKeyAuthentication])
 @permission_classes([IsAPIKeyAuthenticated])
@@ -293,6 +298,7 @@ def bulk_create_workers(request):
     )
 
 
+@conditional_page
 @api_view(["GET"])
 @authentication_classes([APIKeyAuthentication])
 @permission_classes([IsAPIKeyAuthenticated])
@@ -3,6 +3,8 @@ Models for worker profiles, skills, and certifications.
 """
 
 import uuid
+from decimal import Decimal
+
 from django.contrib.auth.models import (
     AbstractBaseUser,
     BaseUserManager,
@@ -165,6 +167,9 @@ class WorkerProfile(models.Model):
         decimal_places=2,
         default=0.0,
     )
+    # Running rating aggregates, maintained incrementally by Rating.save
+    rating_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -175,12 +180,25 @@ class WorkerProfile(models.Model):
             return 0
         return round((self.total_tasks_completed / self.total_tasks_assigned) * 100, 2)
 
-    def update_reputation(self):
+    def compute_reputation(self):
         # (average_rating * 20) + (completion_rate * 10 / 100)
         rating_component = float(self.average_rating) * 20
         completion_component = self.completion_rate * 0.1
-        self.reputation_score = round(rating_component + completion_component, 2)
-        self.save()
+        return round(rating_component + completion_component, 2)
+
+    def update_reputation(self):
+        self.reputation_score = self.compute_reputation()
+        self.save(update_fields=["reputation_score", "updated_at"])
+
+    def refresh_rating_stats(self):
+        """Derive average_rating and reputation_score from the rating aggregates"""
+        if self.rating_count:
+            self.average_rating = round(
+                Decimal(self.rating_sum) / Decimal(self.rating_count), 2
+            )
+        else:
+            self.average_rating = Decimal("0.00")
+        self.reputation_score = self.compute_reputation()
 
     class Meta:
         db_table = "worker_profiles"
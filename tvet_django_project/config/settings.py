@@ -27,6 +27,11 @@ CPASS_API_URL = os.getenv("CPASS_API_URL")
 if not CPASS_API_URL:
     raise ValueError("CPASS_API_URL environment variable is not set.")
 
+# Pooled connections, retries and ETag response cache; see dashboard/cpass_client.py
+CPASS_POOL_SIZE = int(os.getenv("CPASS_POOL_SIZE", 10))
+CPASS_MAX_RETRIES = int(os.getenv("CPASS_MAX_RETRIES", 3))
+CPASS_RESPONSE_CACHE_SIZE = int(os.getenv("CPASS_RESPONSE_CACHE_SIZE", 256))
+
 # Application definition
 INSTALLED_APPS = [
     "django.contrib.admin",
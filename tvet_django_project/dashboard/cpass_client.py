@@ -9,15 +9,97 @@ TVET Dashboard uses this to:
 - Get institution stats
 
 All worker data lives in CPASS. This dashboard just consumes it.
+
+Requests go through one ``requests.Session`` per CPASS base URL, shared by
+every client in the process, so connections are kept alive and reused
+instead of opened per call. Each session keeps up to ``CPASS_POOL_SIZE``
+connections (default 10). Requests that could not connect, and idempotent
+requests answered with 502/503/504, are retried up to ``CPASS_MAX_RETRIES``
+times (default 3) with exponential backoff. A POST that reached the server
+is never retried.
+
+GET responses are kept with their ETag (up to ``CPASS_RESPONSE_CACHE_SIZE``,
+default 256). Repeating a GET sends the ETag back, and a 304 Not Modified
+answer reuses the kept body instead of downloading it again.
 """
 
+import copy
+import threading
+from collections import OrderedDict
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Optional, Dict, List, Any
 from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(base_url: str) -> requests.Session:
+    """The shared, pooled session for ``base_url``"""
+    session = _sessions.get(base_url)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(base_url)
+            if session is None:
+                session = _sessions[base_url] = build_session()
+    return session
+
+
+def build_session() -> requests.Session:
+    retries = Retry(
+        total=getattr(settings, "CPASS_MAX_RETRIES", 3),
+        backoff_factor=0.5,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        respect_retry_after_header=True,
+        # Hand the last response back so _request reports the API's error
+        raise_on_status=False,
+    )
+    pool_size = getattr(settings, "CPASS_POOL_SIZE", 10)
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class ResponseCache:
+    """Thread-safe LRU of (ETag, parsed body) per request"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, etag: str, body):
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+response_cache = ResponseCache(getattr(settings, "CPASS_RESPONSE_CACHE_SIZE", 256))
+
 
 class CPASSAPIError(Exception):
     """Exception raised when CPASS API returns an error."""
@@ -53,17 +135,31 @@ class CPASSClient:
     ) -> dict:
         """Make a request to CPASS API."""
         url = f"{self.base_url}/public{endpoint}"
+        headers = self._get_headers()
+
+        cache_key = None
+        cached = None
+        if method == "GET":
+            # Responses depend on the institution, so the key is part of it
+            cache_key = (self.api_key, url, tuple(sorted((params or {}).items())))
+            cached = response_cache.get(cache_key)
+            if cached:
+                headers["If-None-Match"] = cached[0]
 
         try:
-            response = requests.request(
+            response = get_session(self.base_url).request(
                 method=method,
                 url=url,
-                headers=self._get_headers(),
+                headers=headers,
                 json=data,
                 params=params,
                 timeout=self.timeout,
             )
 
+            if response.status_code == 304 and cached:
+                # Callers may change what they get back
+                return copy.deepcopy(cached[1])
+
             if response.status_code == 401:
                 raise CPASSAPIError("Invalid API key", status_code=401)
 
@@ -81,7 +177,14 @@ class CPASSClient:
                     details=error_data,
                 )
 
-            return response.json()
+            body = response.json()
+            if cache_key:
+                etag = response.headers.get("ETag")
+                if etag:
+                    response_cache.set(cache_key, etag, copy.deepcopy(body))
+                else:
+                    response_cache.delete(cache_key)
+            return body
 
         except requests.RequestException as e:
             logger.error(f"CPASS API request failed: {e}")